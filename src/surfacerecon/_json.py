@@ -0,0 +1,23 @@
+"""Internal JSON helpers backed by orjson.
+
+Callers should open files in binary mode ("rb"/"wb"): orjson consumes and
+produces bytes (UTF-8, equivalent to ensure_ascii=False).
+"""
+
+from typing import Any
+
+import orjson
+
+JSONDecodeError = orjson.JSONDecodeError
+
+_DUMP_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+
+
+def loads(data: bytes | str) -> Any:
+    """Parse JSON from bytes or str."""
+    return orjson.loads(data)
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize to indented UTF-8 JSON bytes."""
+    return orjson.dumps(obj, option=_DUMP_OPTIONS)
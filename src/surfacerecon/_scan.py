@@ -0,0 +1,65 @@
+"""Keyword scanning helpers with an optional Hyperscan backend.
+
+Hyperscan compiles all keywords into one shared DFA and scans in a single
+pass, which stays constant-time as the keyword lists grow. It is an
+optional dependency (the ``speedups`` extra); without it, matching falls
+back to a compiled case-insensitive alternation regex.
+"""
+
+import re
+from typing import Callable, Sequence
+
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+
+def _regex_matcher(keywords: Sequence[str]) -> Callable[[str], bool]:
+    pattern = re.compile(
+        "|".join(re.escape(keyword) for keyword in keywords), re.IGNORECASE
+    )
+
+    def match(text: str) -> bool:
+        return pattern.search(text) is not None
+
+    return match
+
+
+def _hyperscan_matcher(keywords: Sequence[str]) -> Callable[[str], bool]:
+    db = hyperscan.Database()
+    db.compile(
+        expressions=[re.escape(keyword).encode() for keyword in keywords],
+        ids=list(range(len(keywords))),
+        flags=[hyperscan.HS_FLAG_CASELESS] * len(keywords),
+    )
+
+    def match(text: str) -> bool:
+        found = False
+
+        def on_match(pattern_id, start, end, flags, context=None):
+            nonlocal found
+            found = True
+            return 1  # stop scanning after the first hit
+
+        try:
+            db.scan(text.encode(), match_event_handler=on_match)
+        except hyperscan.error:
+            pass  # scan terminated early by the handler
+        return found
+
+    return match
+
+
+def build_matcher(keywords: Sequence[str]) -> Callable[[str], bool]:
+    """Return a callable testing whether any keyword occurs in a string.
+
+    Matching is case-insensitive. Prefers the Hyperscan backend when
+    available, otherwise uses a single compiled alternation.
+    """
+    if hyperscan is not None:
+        try:
+            return _hyperscan_matcher(keywords)
+        except Exception:
+            pass
+    return _regex_matcher(keywords)
@@ -1,12 +1,16 @@
 """Diff analyzer for comparing responses and detecting vulnerabilities."""
 
-import json
 import logging
+from collections import Counter
+from functools import cached_property
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
+from urllib.parse import urlparse
 
-from deepdiff import DeepDiff
+import orjson
 
+from surfacerecon import _json
+from surfacerecon._scan import build_matcher
 from surfacerecon.settings import (
     STATUS_CHANGE_HIGH,
     STATUS_CHANGE_MEDIUM,
@@ -16,10 +20,160 @@ from surfacerecon.settings import (
 
 logger = logging.getLogger(__name__)
 
+# Shared keyword matcher built once (Hyperscan when installed, compiled
+# alternation otherwise)
+_sensitive_match = build_matcher(SENSITIVE_FIELDS)
+
+# Headers excluded from generated curl commands
+_SKIP_HEADERS = frozenset({"content-length", "host"})
+
+
+class ResponseDiff:
+    """Lightweight diff between two JSON-like structures.
+
+    Collects only the change categories the analyzer consumes:
+    added paths, removed paths, and changed values keyed by dotted path.
+    """
+
+    def __init__(self):
+        self.added: List[str] = []
+        self.removed: List[str] = []
+        self.changed: List[Tuple[str, Any, Any]] = []  # (path, old, new)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+    def __str__(self) -> str:
+        parts = []
+        if self.added:
+            parts.append(f"added: {self.added}")
+        if self.removed:
+            parts.append(f"removed: {self.removed}")
+        if self.changed:
+            changes = ", ".join(
+                f"{path}: {old!r} -> {new!r}" for path, old, new in self.changed
+            )
+            parts.append(f"changed: {changes}")
+        return "; ".join(parts)
+
+    def all_paths(self) -> List[str]:
+        """All affected paths as a flat list."""
+        return self.added + self.removed + [path for path, _, _ in self.changed]
+
+
+def _child_path(path: str, key: Any) -> str:
+    """Build a dotted path for a child key."""
+    return f"{path}.{key}" if path else str(key)
+
+
+def _fast_diff(a: Any, b: Any, path: str, out: ResponseDiff) -> None:
+    """
+    Recursively diff two JSON-like values into `out`.
+
+    Short-circuits identical objects/values at the top; lists are compared
+    as unordered multisets of their serialized elements.
+    """
+    if a is b or a == b:
+        return
+
+    if type(a) is dict and type(b) is dict:
+        for key, value in a.items():
+            if key in b:
+                _fast_diff(value, b[key], _child_path(path, key), out)
+            else:
+                out.removed.append(_child_path(path, key))
+        for key in b:
+            if key not in a:
+                out.added.append(_child_path(path, key))
+        return
+
+    if type(a) is list and type(b) is list:
+        # Order-insensitive comparison via serialized element counts
+        try:
+            a_counts = Counter(orjson.dumps(item) for item in a)
+            b_counts = Counter(orjson.dumps(item) for item in b)
+        except TypeError:
+            out.changed.append((path, a, b))
+            return
+
+        remaining = a_counts.copy()
+        for i, item in enumerate(b):
+            key = orjson.dumps(item)
+            if remaining.get(key):
+                remaining[key] -= 1
+            else:
+                out.added.append(f"{path}[{i}]")
+        leftover = a_counts - b_counts
+        for i, item in enumerate(a):
+            key = orjson.dumps(item)
+            if leftover.get(key):
+                leftover[key] -= 1
+                out.removed.append(f"{path}[{i}]")
+        return
+
+    out.changed.append((path, a, b))
+
+
+def compare_responses(
+    baseline: Dict[str, Any],
+    test_result: Dict[str, Any],
+) -> Optional[ResponseDiff]:
+    """
+    Compare baseline and test responses.
+
+    Args:
+        baseline: Baseline response dictionary
+        test_result: Test result dictionary with response
+
+    Returns:
+        ResponseDiff object if differences found, None otherwise
+    """
+    if not test_result.get("success") or not test_result.get("response"):
+        return None
+
+    baseline_response = baseline.get("response", {})
+    test_response = test_result.get("response", {})
+
+    baseline_body = baseline_response.get("body", "")
+    test_body = test_response.get("body", "")
+
+    # Identical bodies can't differ; bail out before any parsing
+    if baseline_body == test_body:
+        return None
+
+    # Try to parse as JSON for better comparison; the startswith probe
+    # skips the parse for bodies that can't be JSON containers
+    baseline_json = None
+    test_json = None
+
+    if baseline_body.startswith(("{", "[")) and test_body.startswith(("{", "[")):
+        try:
+            baseline_json = orjson.loads(baseline_body)
+        except (orjson.JSONDecodeError, ValueError):
+            pass
+
+        try:
+            test_json = orjson.loads(test_body)
+        except (orjson.JSONDecodeError, ValueError):
+            pass
+
+    # Compare JSON if both are JSON
+    if baseline_json is not None and test_json is not None:
+        diff = ResponseDiff()
+        _fast_diff(baseline_json, test_json, "", diff)
+        if diff:
+            return diff
+        return None
+
+    # Compare as strings if not both JSON; bodies are known to differ here
+    diff = ResponseDiff()
+    diff.changed.append(("body", baseline_body, test_body))
+    return diff
+
 
 class Finding:
     """Represents a vulnerability finding."""
-    
+
     def __init__(
         self,
         finding_id: str,
@@ -30,7 +184,7 @@ class Finding:
         description: str,
         baseline_status: int,
         test_status: int,
-        diff_summary: str,
+        diff: Optional[ResponseDiff],
         curl_command: str,
     ):
         self.finding_id = finding_id
@@ -41,9 +195,20 @@ class Finding:
         self.description = description
         self.baseline_status = baseline_status
         self.test_status = test_status
-        self.diff_summary = diff_summary
+        self.diff = diff
         self.curl_command = curl_command
-    
+
+    @cached_property
+    def diff_summary(self) -> str:
+        """Truncated diff text, formatted on first access.
+
+        LOW findings only ever appear as report table rows, so their diff
+        is never stringified.
+        """
+        if self.severity == "LOW" or not self.diff:
+            return ""
+        return str(self.diff)[:500]  # Truncate long diffs
+
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary."""
         return {
@@ -60,100 +225,26 @@ class Finding:
         }
 
 
-def compare_responses(
-    baseline: Dict[str, Any],
-    test_result: Dict[str, Any],
-) -> Optional[DeepDiff]:
-    """
-    Compare baseline and test responses using deepdiff.
-    
-    Args:
-        baseline: Baseline response dictionary
-        test_result: Test result dictionary with response
-        
-    Returns:
-        DeepDiff object if differences found, None otherwise
-    """
-    if not test_result.get("success") or not test_result.get("response"):
-        return None
-    
-    baseline_response = baseline.get("response", {})
-    test_response = test_result.get("response", {})
-    
-    baseline_body = baseline_response.get("body", "")
-    test_body = test_response.get("body", "")
-    
-    # Try to parse as JSON for better comparison
-    baseline_json = None
-    test_json = None
-    
-    try:
-        if baseline_body and baseline_body != "(unable to read body)":
-            baseline_json = json.loads(baseline_body)
-    except (json.JSONDecodeError, ValueError):
-        pass
-    
-    try:
-        if test_body and test_body != "(unable to read body)":
-            test_json = json.loads(test_body)
-    except (json.JSONDecodeError, ValueError):
-        pass
-    
-    # Compare JSON if both are JSON
-    if baseline_json is not None and test_json is not None:
-        diff = DeepDiff(baseline_json, test_json, ignore_order=True, verbose_level=2)
-        if diff:
-            return diff
-    
-    # Compare as strings if not both JSON
-    if baseline_body != test_body:
-        # Create a simple diff representation
-        diff = DeepDiff(
-            {"body": baseline_body},
-            {"body": test_body},
-            ignore_order=False,
-            verbose_level=1,
-        )
-        return diff
-    
-    return None
-
-
-def detect_sensitive_field_changes(diff: DeepDiff) -> List[str]:
+def detect_sensitive_field_changes(diff: ResponseDiff) -> List[str]:
     """Detect changes in sensitive fields."""
     changed_fields = []
-    
-    # Check dictionary item changes
-    if "dictionary_item_added" in diff:
-        for item in diff["dictionary_item_added"]:
-            field_path = str(item)
-            if any(sensitive in field_path.lower() for sensitive in SENSITIVE_FIELDS):
-                changed_fields.append(field_path)
-    
-    if "dictionary_item_removed" in diff:
-        for item in diff["dictionary_item_removed"]:
-            field_path = str(item)
-            if any(sensitive in field_path.lower() for sensitive in SENSITIVE_FIELDS):
-                changed_fields.append(field_path)
-    
-    if "values_changed" in diff:
-        for item in diff["values_changed"]:
-            field_path = str(item)
-            if any(sensitive in field_path.lower() for sensitive in SENSITIVE_FIELDS):
-                changed_fields.append(field_path)
-    
+
+    for field_path in diff.all_paths():
+        if _sensitive_match(field_path):
+            changed_fields.append(field_path)
+
     return changed_fields
 
 
 def calculate_severity(
     baseline_status: int,
     test_status: int,
-    diff: Optional[DeepDiff],
+    diff: Optional[ResponseDiff],
     test_type: str,
 ) -> str:
     """
     Calculate severity based on status changes and differences.
-    
+
     Returns:
         "HIGH", "MEDIUM", or "LOW"
     """
@@ -161,37 +252,37 @@ def calculate_severity(
     if baseline_status in STATUS_CHANGE_HIGH:
         if test_status in STATUS_CHANGE_HIGH[baseline_status]:
             return "HIGH"
-    
+
     if baseline_status in STATUS_CHANGE_MEDIUM:
         if test_status in STATUS_CHANGE_MEDIUM[baseline_status]:
             return "MEDIUM"
-    
+
     # Check for sensitive field changes
     if diff:
         sensitive_changes = detect_sensitive_field_changes(diff)
         if sensitive_changes:
             return "HIGH"
-        
+
         # Check length difference
-        baseline_body_len = len(str(diff.get("old_value", "")))
-        test_body_len = len(str(diff.get("new_value", "")))
-        
+        baseline_body_len = sum(len(str(old)) for _, old, _ in diff.changed)
+        test_body_len = sum(len(str(new)) for _, _, new in diff.changed)
+
         if baseline_body_len > 0:
             length_diff = abs(test_body_len - baseline_body_len) / baseline_body_len
             if length_diff > LENGTH_DIFF_THRESHOLD:
                 return "MEDIUM"
-    
+
     # Status unchanged but body different
     if baseline_status == test_status == 200 and diff:
         # Check if it's an IDOR read (same status, different content)
         if test_type == "IDOR":
             return "HIGH"
         return "MEDIUM"
-    
+
     # Other differences
     if diff:
         return "LOW"
-    
+
     return "LOW"
 
 
@@ -201,101 +292,110 @@ def generate_curl_command(test: Dict[str, Any], test_result: Dict[str, Any]) ->
     url = test_result.get("url", test.get("url", ""))
     headers = test_result.get("response", {}).get("headers", {})
     body = test.get("body")
-    
+
     cmd_parts = ["curl", "-X", method]
-    
+
     # Add headers
     for key, value in headers.items():
-        if key.lower() not in ["content-length", "host"]:
+        if key.lower() not in _SKIP_HEADERS:
             cmd_parts.append("-H")
             cmd_parts.append(f'"{key}: {value}"')
-    
+
     # Add body if present
     if body and method in ["POST", "PUT", "PATCH"]:
-        body_str = json.dumps(body)
+        body_str = orjson.dumps(body).decode()
         cmd_parts.append("-d")
         cmd_parts.append(f"'{body_str}'")
-    
+
     cmd_parts.append(f'"{url}"')
-    
+
     return " ".join(cmd_parts)
 
 
 def analyze_results(
-    requests_file: Path,
-    test_results_file: Path,
-    tests_file: Path,
+    requests: Path | List[Dict[str, Any]],
+    test_results: Path | List[Dict[str, Any]],
+    tests: Path | List[Dict[str, Any]],
     output_file: Path,
 ) -> List[Finding]:
     """
     Analyze test results against baseline and generate findings.
-    
+
+    Each input is either a path to the corresponding JSON artifact or the
+    already-loaded list of dictionaries; the full pipeline hands results
+    over in memory instead of round-tripping them through disk.
+
     Args:
-        requests_file: Path to baseline requests.json
-        test_results_file: Path to test_results.json
-        tests_file: Path to tests.json
+        requests: Baseline requests.json path or loaded requests
+        test_results: test-results path (JSON Lines or a legacy JSON
+            array) or loaded results
+        tests: tests.json path or loaded tests
         output_file: Path to save findings.json
-        
+
     Returns:
         List of Finding objects
     """
-    # Load baseline requests
-    with open(requests_file, "r", encoding="utf-8") as f:
-        baseline_requests = json.load(f)
-    
-    # Load test results
-    with open(test_results_file, "r", encoding="utf-8") as f:
-        test_results = json.load(f)
-    
-    # Load tests for metadata
-    with open(tests_file, "r", encoding="utf-8") as f:
-        tests = json.load(f)
-    
+    baseline_requests = (
+        _json.loads(requests.read_bytes()) if isinstance(requests, Path) else requests
+    )
+    if isinstance(test_results, Path):
+        raw = test_results.read_bytes()
+        if raw.lstrip().startswith(b"["):
+            test_results = _json.loads(raw)
+        else:
+            # JSON Lines (current runner output): one result per line
+            test_results = [_json.loads(line) for line in raw.splitlines() if line]
+    if isinstance(tests, Path):
+        tests = _json.loads(tests.read_bytes())
+
     # Create lookup for tests by test_id
     tests_by_id = {test["test_id"]: test for test in tests}
-    
-    # Create lookup for baseline requests by URL and method
+
+    # Create lookups for baseline requests: exact (url, method), path-only
+    # near match, and first-per-method fallback
     baseline_by_url_method: Dict[tuple[str, str], Dict[str, Any]] = {}
+    baseline_by_path: Dict[str, Dict[str, Any]] = {}
+    baseline_by_method: Dict[str, Dict[str, Any]] = {}
     for req in baseline_requests:
         url = req.get("url", "")
         method = req.get("method", "GET")
         baseline_by_url_method[(url, method)] = req
-    
+        baseline_by_path.setdefault(urlparse(url).path, req)
+        baseline_by_method.setdefault(method, req)
+
     findings: List[Finding] = []
-    
+
     for test_result in test_results:
         if not test_result.get("success"):
             continue
-        
+
         test_id = test_result.get("test_id", "")
         test = tests_by_id.get(test_id)
         if not test:
             continue
-        
+
         test_url = test_result.get("url", test.get("url", ""))
         test_method = test.get("method", "GET")
-        
+
         # Find matching baseline
         baseline = baseline_by_url_method.get((test_url, test_method))
-        
-        # If exact match not found, try to find by endpoint pattern
+
+        # If exact match not found, try a path near-match, then any request
+        # with the same method
+        if not baseline:
+            baseline = baseline_by_path.get(urlparse(test_url).path)
         if not baseline:
-            # Try to find a similar baseline request
-            for req in baseline_requests:
-                if req.get("method") == test_method:
-                    # Simple matching - could be improved
-                    baseline = req
-                    break
-        
+            baseline = baseline_by_method.get(test_method)
+
         if not baseline or "response" not in baseline:
             continue
-        
+
         baseline_status = baseline["response"].get("status", 0)
         test_status = test_result["response"].get("status", 0)
-        
+
         # Compare responses
         diff = compare_responses(baseline, test_result)
-        
+
         # Calculate severity
         severity = calculate_severity(
             baseline_status,
@@ -303,15 +403,10 @@ def analyze_results(
             diff,
             test.get("test_type", ""),
         )
-        
-        # Generate diff summary
-        diff_summary = ""
-        if diff:
-            diff_summary = str(diff)[:500]  # Truncate long diffs
-        
+
         # Generate curl command
         curl_cmd = generate_curl_command(test, test_result)
-        
+
         finding = Finding(
             finding_id=f"finding_{len(findings) + 1}",
             severity=severity,
@@ -321,20 +416,19 @@ def analyze_results(
             description=test.get("description", ""),
             baseline_status=baseline_status,
             test_status=test_status,
-            diff_summary=diff_summary,
+            diff=diff,
             curl_command=curl_cmd,
         )
-        
+
         findings.append(finding)
-    
+
     # Save findings
     output_file.parent.mkdir(parents=True, exist_ok=True)
     findings_data = [finding.to_dict() for finding in findings]
-    
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(findings_data, f, indent=2, ensure_ascii=False)
-    
+
+    with open(output_file, "wb") as f:
+        f.write(_json.dumps(findings_data))
+
     logger.info(f"Generated {len(findings)} findings, saved to {output_file}")
-    
-    return findings
 
+    return findings
@@ -1,169 +1,213 @@
 """Report generator for creating markdown and JSON reports."""
 
-import json
 import logging
+from operator import itemgetter
 from pathlib import Path
 from typing import Dict, List, Any
 from collections import defaultdict
 
+from surfacerecon import _json
+
 logger = logging.getLogger(__name__)
 
+# One itemgetter unpack per finding instead of repeated .get calls;
+# missing keys are default-filled by merging over _FINDING_DEFAULTS
+_FINDING_DEFAULTS = {
+    "test_type": "N/A",
+    "endpoint": "N/A",
+    "description": "N/A",
+    "baseline_status": "N/A",
+    "test_status": "N/A",
+    "diff_summary": "",
+    "curl_command": "",
+}
+_FINDING_FIELDS = itemgetter(
+    "test_type",
+    "endpoint",
+    "description",
+    "baseline_status",
+    "test_status",
+    "diff_summary",
+    "curl_command",
+)
 
-def generate_markdown_report(
-    findings_file: Path,
-    output_file: Path,
-) -> None:
-    """
-    Generate markdown report from findings.
-    
-    Args:
-        findings_file: Path to findings.json
-        output_file: Path to save report.md
+
+class FindingColumns:
+    """Column-oriented (struct-of-arrays) view of findings for rendering.
+
+    Row dicts are normalized once into parallel lists; the renderers then
+    filter by severity index masks instead of re-indexing dicts per row.
     """
-    with open(findings_file, "r", encoding="utf-8") as f:
-        findings = json.load(f)
-    
-    # Group findings by severity
+
+    def __init__(self):
+        self.severities: List[str] = []
+        self.test_types: List[str] = []
+        self.endpoints: List[str] = []
+        self.descriptions: List[str] = []
+        self.baseline_statuses: List[Any] = []
+        self.test_statuses: List[Any] = []
+        self.diff_summaries: List[str] = []
+        self.curl_commands: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.severities)
+
+    @classmethod
+    def from_dicts(cls, findings: List[Dict[str, Any]]) -> "FindingColumns":
+        """Build columns from a list of finding dictionaries."""
+        cols = cls()
+        for finding in findings:
+            (
+                test_type,
+                endpoint,
+                description,
+                baseline_status,
+                test_status,
+                diff_summary,
+                curl_command,
+            ) = _FINDING_FIELDS({**_FINDING_DEFAULTS, **finding})
+
+            cols.severities.append(finding.get("severity", "LOW"))
+            cols.test_types.append(test_type)
+            cols.endpoints.append(endpoint)
+            cols.descriptions.append(description)
+            cols.baseline_statuses.append(baseline_status)
+            cols.test_statuses.append(test_status)
+            cols.diff_summaries.append(diff_summary)
+            cols.curl_commands.append(curl_command)
+        return cols
+
+    def indices_for(self, severity: str) -> List[int]:
+        """Row indices for one severity, computed in a single column sweep."""
+        return [i for i, s in enumerate(self.severities) if s == severity]
+
+
+def _render_finding_section(
+    cols: FindingColumns,
+    indices: List[int],
+    severity: str,
+    include_diff: bool,
+):
+    """Yield markdown lines for one severity section with detailed findings."""
+    yield f"## {severity} Severity Findings"
+    yield ""
+
+    for n, i in enumerate(indices, 1):
+        test_type = cols.test_types[i]
+
+        yield f"### Finding {n}: {test_type}"
+        yield ""
+        yield f"**Endpoint:** `{cols.endpoints[i]}`"
+        yield f"**Test Type:** {test_type}"
+        yield f"**Description:** {cols.descriptions[i]}"
+        yield ""
+        yield f"**Status Change:** {cols.baseline_statuses[i]} → {cols.test_statuses[i]}"
+        yield ""
+
+        if include_diff and cols.diff_summaries[i]:
+            yield "**Difference Summary:**"
+            yield "```"
+            yield cols.diff_summaries[i][:1000]  # Limit length
+            yield "```"
+            yield ""
+
+        if cols.curl_commands[i]:
+            yield "**Reproduction Command:**"
+            yield "```bash"
+            yield cols.curl_commands[i]
+            yield "```"
+            yield ""
+
+        yield "---"
+        yield ""
+
+
+def _render_markdown(cols: FindingColumns):
+    """Yield report lines one at a time, no intermediate list."""
+    high_idx = cols.indices_for("HIGH")
+    medium_idx = cols.indices_for("MEDIUM")
+    low_idx = cols.indices_for("LOW")
+
+    yield "# surfacerecon Vulnerability Report"
+    yield ""
+    yield "## Executive Summary"
+    yield ""
+    yield f"**Total Findings:** {len(cols)}"
+    yield f"- **HIGH:** {len(high_idx)}"
+    yield f"- **MEDIUM:** {len(medium_idx)}"
+    yield f"- **LOW:** {len(low_idx)}"
+    yield ""
+    yield "---"
+    yield ""
+
+    if high_idx:
+        yield from _render_finding_section(cols, high_idx, "HIGH", include_diff=True)
+
+    if medium_idx:
+        yield from _render_finding_section(cols, medium_idx, "MEDIUM", include_diff=False)
+
+    if low_idx:
+        yield "## LOW Severity Findings"
+        yield ""
+        yield "| Endpoint | Test Type | Status Change |"
+        yield "|----------|-----------|---------------|"
+
+        for i in low_idx:
+            yield (
+                f"| `{cols.endpoints[i]}` | {cols.test_types[i]} "
+                f"| {cols.baseline_statuses[i]} → {cols.test_statuses[i]} |"
+            )
+
+        yield ""
+
+
+def _group_findings(
+    findings: List[Dict[str, Any]],
+) -> tuple[Dict[str, List[Dict[str, Any]]], Dict[str, List[Dict[str, Any]]]]:
+    """Group findings by severity and by test type in a single pass."""
     findings_by_severity: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    findings_by_type: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+
     for finding in findings:
-        severity = finding.get("severity", "LOW")
-        findings_by_severity[severity].append(finding)
-    
-    # Generate report
-    report_lines = [
-        "# surfacerecon Vulnerability Report",
-        "",
-        "## Executive Summary",
-        "",
-        f"**Total Findings:** {len(findings)}",
-        f"- **HIGH:** {len(findings_by_severity.get('HIGH', []))}",
-        f"- **MEDIUM:** {len(findings_by_severity.get('MEDIUM', []))}",
-        f"- **LOW:** {len(findings_by_severity.get('LOW', []))}",
-        "",
-        "---",
-        "",
-    ]
-    
-    # High severity findings
-    if findings_by_severity.get("HIGH"):
-        report_lines.extend([
-            "## HIGH Severity Findings",
-            "",
-        ])
-        
-        for i, finding in enumerate(findings_by_severity["HIGH"], 1):
-            report_lines.extend([
-                f"### Finding {i}: {finding.get('test_type', 'Unknown')}",
-                "",
-                f"**Endpoint:** `{finding.get('endpoint', 'N/A')}`",
-                f"**Test Type:** {finding.get('test_type', 'N/A')}",
-                f"**Description:** {finding.get('description', 'N/A')}",
-                "",
-                f"**Status Change:** {finding.get('baseline_status', 'N/A')} → {finding.get('test_status', 'N/A')}",
-                "",
-            ])
-            
-            if finding.get("diff_summary"):
-                report_lines.extend([
-                    "**Difference Summary:**",
-                    "```",
-                    finding.get("diff_summary", "")[:1000],  # Limit length
-                    "```",
-                    "",
-                ])
-            
-            if finding.get("curl_command"):
-                report_lines.extend([
-                    "**Reproduction Command:**",
-                    "```bash",
-                    finding.get("curl_command", ""),
-                    "```",
-                    "",
-                ])
-            
-            report_lines.append("---")
-            report_lines.append("")
-    
-    # Medium severity findings
-    if findings_by_severity.get("MEDIUM"):
-        report_lines.extend([
-            "## MEDIUM Severity Findings",
-            "",
-        ])
-        
-        for i, finding in enumerate(findings_by_severity["MEDIUM"], 1):
-            report_lines.extend([
-                f"### Finding {i}: {finding.get('test_type', 'Unknown')}",
-                "",
-                f"**Endpoint:** `{finding.get('endpoint', 'N/A')}`",
-                f"**Test Type:** {finding.get('test_type', 'N/A')}",
-                f"**Description:** {finding.get('description', 'N/A')}",
-                "",
-                f"**Status Change:** {finding.get('baseline_status', 'N/A')} → {finding.get('test_status', 'N/A')}",
-                "",
-            ])
-            
-            if finding.get("curl_command"):
-                report_lines.extend([
-                    "**Reproduction Command:**",
-                    "```bash",
-                    finding.get("curl_command", ""),
-                    "```",
-                    "",
-                ])
-            
-            report_lines.append("---")
-            report_lines.append("")
-    
-    # Low severity findings
-    if findings_by_severity.get("LOW"):
-        report_lines.extend([
-            "## LOW Severity Findings",
-            "",
-            "| Endpoint | Test Type | Status Change |",
-            "|----------|-----------|---------------|",
-        ])
-        
-        for finding in findings_by_severity["LOW"]:
-            endpoint = finding.get("endpoint", "N/A")
-            test_type = finding.get("test_type", "N/A")
-            status_change = f"{finding.get('baseline_status', 'N/A')} → {finding.get('test_status', 'N/A')}"
-            report_lines.append(f"| `{endpoint}` | {test_type} | {status_change} |")
-        
-        report_lines.append("")
-    
-    # Write report
+        findings_by_severity[finding.get("severity", "LOW")].append(finding)
+        findings_by_type[finding.get("test_type", "UNKNOWN")].append(finding)
+
+    return findings_by_severity, findings_by_type
+
+
+def _write_markdown_report(cols: FindingColumns, output_file: Path) -> None:
+    """Stream the markdown report straight to disk."""
     output_file.parent.mkdir(parents=True, exist_ok=True)
     with open(output_file, "w", encoding="utf-8") as f:
-        f.write("\n".join(report_lines))
-    
+        f.writelines(line + "\n" for line in _render_markdown(cols))
+
     logger.info(f"Generated markdown report: {output_file}")
 
 
-def generate_json_report(
+def generate_markdown_report(
     findings_file: Path,
     output_file: Path,
 ) -> None:
     """
-    Generate structured JSON report from findings.
-    
+    Generate markdown report from findings.
+
     Args:
         findings_file: Path to findings.json
-        output_file: Path to save report.json
+        output_file: Path to save report.md
     """
-    with open(findings_file, "r", encoding="utf-8") as f:
-        findings = json.load(f)
-    
-    # Group by severity
-    findings_by_severity: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
-    findings_by_type: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
-    
-    for finding in findings:
-        severity = finding.get("severity", "LOW")
-        test_type = finding.get("test_type", "UNKNOWN")
-        findings_by_severity[severity].append(finding)
-        findings_by_type[test_type].append(finding)
-    
+    with open(findings_file, "rb") as f:
+        findings = _json.loads(f.read())
+
+    _write_markdown_report(FindingColumns.from_dicts(findings), output_file)
+
+
+def _write_json_report(
+    findings: List[Dict[str, Any]],
+    findings_by_severity: Dict[str, List[Dict[str, Any]]],
+    findings_by_type: Dict[str, List[Dict[str, Any]]],
+    output_file: Path,
+) -> None:
+    """Write the structured JSON report from pre-grouped findings."""
     report = {
         "summary": {
             "total_findings": len(findings),
@@ -184,26 +228,50 @@ def generate_json_report(
     
     # Write report
     output_file.parent.mkdir(parents=True, exist_ok=True)
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(report, f, indent=2, ensure_ascii=False)
-    
+    with open(output_file, "wb") as f:
+        f.write(_json.dumps(report))
+
     logger.info(f"Generated JSON report: {output_file}")
 
 
-def generate_reports(
+def generate_json_report(
     findings_file: Path,
+    output_file: Path,
+) -> None:
+    """
+    Generate structured JSON report from findings.
+
+    Args:
+        findings_file: Path to findings.json
+        output_file: Path to save report.json
+    """
+    with open(findings_file, "rb") as f:
+        findings = _json.loads(f.read())
+
+    findings_by_severity, findings_by_type = _group_findings(findings)
+    _write_json_report(findings, findings_by_severity, findings_by_type, output_file)
+
+
+def generate_reports(
+    findings: Path | List[Dict[str, Any]],
     scenario_dir: Path,
 ) -> None:
     """
     Generate both markdown and JSON reports.
-    
+
     Args:
-        findings_file: Path to findings.json
+        findings: Path to findings.json, or the already-loaded finding
+            dictionaries (avoids re-reading the file the analyzer just wrote)
         scenario_dir: Scenario directory to save reports
     """
-    markdown_file = scenario_dir / "report.md"
-    json_file = scenario_dir / "report.json"
-    
-    generate_markdown_report(findings_file, markdown_file)
-    generate_json_report(findings_file, json_file)
+    # Load (if needed) and group once, then feed both renderers
+    if isinstance(findings, Path):
+        findings = _json.loads(findings.read_bytes())
+
+    findings_by_severity, findings_by_type = _group_findings(findings)
+
+    _write_markdown_report(FindingColumns.from_dicts(findings), scenario_dir / "report.md")
+    _write_json_report(
+        findings, findings_by_severity, findings_by_type, scenario_dir / "report.json"
+    )
 
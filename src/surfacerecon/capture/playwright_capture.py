@@ -1,19 +1,23 @@
 """Playwright-based traffic capture module."""
 
 import asyncio
-import json
 import logging
 import re
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Optional, Set, Any
 from urllib.parse import urlparse, urljoin
+from weakref import WeakKeyDictionary
 
 from playwright.async_api import async_playwright, Browser, Page, Request, Response
 
+from surfacerecon import _json
+from surfacerecon._scan import build_matcher
 from surfacerecon.settings import (
     DEFAULT_NAVIGATION_DEPTH,
     DEFAULT_MAX_PAGES,
+    DEFAULT_CAPTURE_CONCURRENCY,
     MAX_BODY_SIZE,
     PAYMENT_KEYWORDS,
     DEFAULT_RESEARCHER_HEADER,
@@ -21,6 +25,14 @@ from surfacerecon.settings import (
 
 logger = logging.getLogger(__name__)
 
+# Shared keyword matcher built once; is_payment_route runs on every
+# discovered link during BFS
+_payment_match = build_matcher(PAYMENT_KEYWORDS)
+
+# Non-http(s) scheme prefix (javascript:, mailto:, tel:, ...); anchored
+# pattern, so it stays a plain compiled regex rather than a keyword scan
+_SKIP_SCHEME = re.compile(r"^(?!https?:)[a-z][a-z0-9+.-]*:", re.IGNORECASE)
+
 
 def truncate_body(body: str, max_size: int = MAX_BODY_SIZE) -> str:
     """Truncate body if it exceeds max_size."""
@@ -31,8 +43,13 @@ def truncate_body(body: str, max_size: int = MAX_BODY_SIZE) -> str:
 
 def is_payment_route(url: str) -> bool:
     """Check if URL contains payment-related keywords."""
-    url_lower = url.lower()
-    return any(keyword in url_lower for keyword in PAYMENT_KEYWORDS)
+    return _payment_match(url)
+
+
+@lru_cache(maxsize=4096)
+def _netloc(url: str) -> str:
+    """Cached netloc extraction; URLs repeat heavily across pages."""
+    return urlparse(url).netloc
 
 
 class TrafficCapture:
@@ -44,14 +61,18 @@ class TrafficCapture:
         headers: Optional[Dict[str, str]] = None,
         depth: int = DEFAULT_NAVIGATION_DEPTH,
         max_pages: int = DEFAULT_MAX_PAGES,
+        concurrency: int = DEFAULT_CAPTURE_CONCURRENCY,
     ):
         self.cookies = cookies or []
         self.headers = headers or {}
         self.depth = depth
         self.max_pages = max_pages
+        self.concurrency = concurrency
         self.captured_requests: List[Dict[str, Any]] = []
         self.visited_urls: Set[str] = set()
-        self.url_queue: List[tuple[str, int]] = []  # (url, depth)
+        # Response matching index keyed by the live Request object; weak
+        # keys avoid both unbounded growth and id() reuse after GC
+        self._pending: "WeakKeyDictionary[Request, Dict[str, Any]]" = WeakKeyDictionary()
 
     async def capture_session(
         self, whitelist_urls: List[str], output_dir: Path
@@ -59,6 +80,10 @@ class TrafficCapture:
         """
         Capture traffic from whitelist URLs using BFS navigation.
 
+        Pages are visited by a bounded pool of concurrent workers; each
+        page.goto is latency-bound, so the crawl overlaps navigation across
+        workers instead of serializing visits.
+
         Args:
             whitelist_urls: List of starting URLs
             output_dir: Directory to save captured data
@@ -83,33 +108,39 @@ class TrafficCapture:
             elif DEFAULT_RESEARCHER_HEADER:
                 await context.set_extra_http_headers(DEFAULT_RESEARCHER_HEADER)
 
-            # Set up request/response listeners
+            # Set up request/response listeners. Responses are queued and
+            # consumed by a bounded worker group so slow body reads don't
+            # serialize the event pipeline.
             context.on("request", self._on_request)
-            
-            # Store response handler
-            async def response_handler(response: Response):
-                await self._on_response_async(response)
-            
-            context.on("response", response_handler)
+
+            response_queue: asyncio.Queue[Response] = asyncio.Queue()
+            context.on("response", response_queue.put_nowait)
+
+            async def response_worker() -> None:
+                while True:
+                    response = await response_queue.get()
+                    try:
+                        await self._on_response_async(response)
+                    finally:
+                        response_queue.task_done()
+
+            response_workers = [
+                asyncio.create_task(response_worker())
+                for _ in range(self.concurrency)
+            ]
 
             # Initialize queue with whitelist URLs
+            url_queue: asyncio.Queue[tuple[str, int]] = asyncio.Queue()
             for url in whitelist_urls:
                 if not is_payment_route(url):
-                    self.url_queue.append((url, 0))
                     self.visited_urls.add(url)
+                    url_queue.put_nowait((url, 0))
 
-            # BFS navigation
+            state_lock = asyncio.Lock()
             pages_visited = 0
-            while self.url_queue and pages_visited < self.max_pages:
-                url, current_depth = self.url_queue.pop(0)
-
-                if current_depth > self.depth:
-                    continue
-
-                if is_payment_route(url):
-                    logger.info(f"Skipping payment route: {url}")
-                    continue
 
+            async def visit(url: str, current_depth: int) -> None:
+                nonlocal pages_visited
                 try:
                     page = await context.new_page()
                     await page.goto(url, wait_until="networkidle", timeout=30000)
@@ -120,24 +151,56 @@ class TrafficCapture:
                     # Extract links for BFS
                     if current_depth < self.depth:
                         links = await self._extract_links(page, url)
-                        for link in links:
-                            if link not in self.visited_urls and not is_payment_route(link):
-                                self.visited_urls.add(link)
-                                self.url_queue.append((link, current_depth + 1))
+                        async with state_lock:
+                            for link in links:
+                                if link not in self.visited_urls and not is_payment_route(link):
+                                    self.visited_urls.add(link)
+                                    url_queue.put_nowait((link, current_depth + 1))
 
                     await page.close()
-                    pages_visited += 1
-                    logger.info(f"Captured page {pages_visited}: {url}")
+                    async with state_lock:
+                        pages_visited += 1
+                        logger.info(f"Captured page {pages_visited}: {url}")
 
                 except Exception as e:
                     logger.warning(f"Error capturing {url}: {e}")
-                    continue
+
+            async def worker() -> None:
+                while True:
+                    url, current_depth = await url_queue.get()
+                    try:
+                        if current_depth > self.depth:
+                            continue
+                        async with state_lock:
+                            if pages_visited >= self.max_pages:
+                                continue
+                        await visit(url, current_depth)
+                    finally:
+                        url_queue.task_done()
+
+            workers = [
+                asyncio.create_task(worker()) for _ in range(self.concurrency)
+            ]
+            await url_queue.join()
+            for w in workers:
+                w.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+            # Drain pending response reads, but don't let one slow body
+            # block shutdown indefinitely
+            try:
+                await asyncio.wait_for(response_queue.join(), timeout=30)
+            except asyncio.TimeoutError:
+                logger.warning("Timed out waiting for pending response bodies")
+            for w in response_workers:
+                w.cancel()
+            await asyncio.gather(*response_workers, return_exceptions=True)
 
             await browser.close()
 
         # Save captured requests
-        with open(requests_file, "w", encoding="utf-8") as f:
-            json.dump(self.captured_requests, f, indent=2, ensure_ascii=False)
+        with open(requests_file, "wb") as f:
+            f.write(_json.dumps(self.captured_requests))
 
         logger.info(f"Captured {len(self.captured_requests)} requests to {requests_file}")
         return requests_file
@@ -152,8 +215,8 @@ class TrafficCapture:
                 "post_data": truncate_body(request.post_data or ""),
                 "timestamp": datetime.now().isoformat(),
             }
-            # Store with request ID for matching with response
-            request_data["_request_id"] = id(request)
+            # Index by the request object for O(1) matching with the response
+            self._pending[request] = request_data
             self.captured_requests.append(request_data)
         except Exception as e:
             logger.warning(f"Error capturing request: {e}")
@@ -162,56 +225,54 @@ class TrafficCapture:
         """Capture response details and match with request (async version)."""
         try:
             # Find matching request
-            request_id = id(response.request)
-            for req_data in reversed(self.captured_requests):
-                if req_data.get("_request_id") == request_id:
-                    try:
-                        body = await response.text()
-                        req_data["response"] = {
-                            "status": response.status,
-                            "status_text": response.status_text,
-                            "headers": response.headers,
-                            "body": truncate_body(body),
-                        }
-                    except Exception:
-                        # If body can't be read, just capture status/headers
-                        req_data["response"] = {
-                            "status": response.status,
-                            "status_text": response.status_text,
-                            "headers": response.headers,
-                            "body": "(unable to read body)",
-                        }
-                    break
+            req_data = self._pending.pop(response.request, None)
+            if req_data is None:
+                return
+            try:
+                body = await response.text()
+                req_data["response"] = {
+                    "status": response.status,
+                    "status_text": response.status_text,
+                    "headers": response.headers,
+                    "body": truncate_body(body),
+                }
+            except Exception:
+                # If body can't be read, just capture status/headers
+                req_data["response"] = {
+                    "status": response.status,
+                    "status_text": response.status_text,
+                    "headers": response.headers,
+                    "body": "(unable to read body)",
+                }
         except Exception as e:
             logger.warning(f"Error capturing response: {e}")
 
     async def _fill_forms(self, page: Page) -> None:
-        """Fill form inputs with safe defaults."""
-        try:
-            # Fill text inputs
-            text_inputs = await page.query_selector_all("input[type='text'], input[type='email'], input[type='search']")
-            for input_elem in text_inputs:
-                try:
-                    input_type = await input_elem.get_attribute("type")
-                    name = await input_elem.get_attribute("name") or ""
-                    placeholder = await input_elem.get_attribute("placeholder") or ""
-
-                    if "email" in input_type or "email" in name.lower():
-                        await input_elem.fill("test@example.com")
-                    elif "search" in input_type or "search" in name.lower() or "search" in placeholder.lower():
-                        await input_elem.fill("test")
-                    else:
-                        await input_elem.fill("test")
-                except Exception:
-                    continue
+        """Fill form inputs with safe defaults.
 
-            # Fill textareas
-            textareas = await page.query_selector_all("textarea")
-            for textarea in textareas:
-                try:
-                    await textarea.fill("test")
-                except Exception:
-                    continue
+        All inputs are inspected and filled in a single browser-side pass
+        instead of one CDP round-trip per attribute and fill.
+        """
+        try:
+            await page.evaluate("""() => {
+                const fill = (el, value) => {
+                    el.value = value;
+                    el.dispatchEvent(new Event('input', {bubbles: true}));
+                    el.dispatchEvent(new Event('change', {bubbles: true}));
+                };
+                document.querySelectorAll(
+                    "input[type='text'], input[type='email'], input[type='search']"
+                ).forEach(el => {
+                    const type = el.getAttribute('type') || '';
+                    const name = (el.getAttribute('name') || '').toLowerCase();
+                    if (type.includes('email') || name.includes('email')) {
+                        fill(el, 'test@example.com');
+                    } else {
+                        fill(el, 'test');
+                    }
+                });
+                document.querySelectorAll('textarea').forEach(el => fill(el, 'test'));
+            }""")
 
             # Don't submit forms automatically to avoid unwanted actions
         except Exception as e:
@@ -229,26 +290,21 @@ class TrafficCapture:
                 return links;
             }""")
 
-            # Resolve relative URLs
-            resolved_links = []
-            parsed_base = urlparse(base_url)
+            # Resolve relative URLs; dedupe raw hrefs before parsing
+            resolved_links = set()
+            base_netloc = _netloc(base_url)
 
-            for link in links:
-                try:
-                    # Skip javascript:, mailto:, tel:, etc.
-                    if ":" in link and not link.startswith("http"):
-                        continue
+            for link in set(links):
+                if _SKIP_SCHEME.match(link):
+                    continue
 
-                    resolved = urljoin(base_url, link)
-                    parsed = urlparse(resolved)
+                resolved = urljoin(base_url, link)
 
-                    # Only include same-domain links
-                    if parsed.netloc == parsed_base.netloc:
-                        resolved_links.append(resolved)
-                except Exception:
-                    continue
+                # Only include same-domain links
+                if _netloc(resolved) == base_netloc:
+                    resolved_links.add(resolved)
 
-            return list(set(resolved_links))
+            return list(resolved_links)
         except Exception as e:
             logger.debug(f"Error extracting links: {e}")
             return []
@@ -261,6 +317,7 @@ async def capture_session(
     headers: Optional[Dict[str, str]] = None,
     depth: int = DEFAULT_NAVIGATION_DEPTH,
     max_pages: int = DEFAULT_MAX_PAGES,
+    concurrency: int = DEFAULT_CAPTURE_CONCURRENCY,
 ) -> Path:
     """
     Main entry point for capturing a session.
@@ -272,10 +329,17 @@ async def capture_session(
         headers: Optional headers to apply
         depth: Navigation depth for BFS
         max_pages: Maximum pages to visit
+        concurrency: Maximum concurrent page visits
 
     Returns:
         Path to the requests.json file
     """
-    capture = TrafficCapture(cookies=cookies, headers=headers, depth=depth, max_pages=max_pages)
+    capture = TrafficCapture(
+        cookies=cookies,
+        headers=headers,
+        depth=depth,
+        max_pages=max_pages,
+        concurrency=concurrency,
+    )
     return await capture.capture_session(whitelist_urls, output_dir)
 
@@ -1,13 +1,14 @@
 """CLI module for surfacerecon."""
 
 import asyncio
-import json
 import logging
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Any, Optional
 
 import click
 
+from surfacerecon import _json
 from surfacerecon.capture.playwright_capture import capture_session
 from surfacerecon.parser.har_parser import parse_requests, save_endpoints
 from surfacerecon.parser.id_inference import enhance_endpoints_with_ids
@@ -29,11 +30,20 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=32)
+def _load_json_cached(file_path: str, mtime_ns: int) -> Any:
+    return _json.loads(Path(file_path).read_bytes())
+
+
 def load_json_file(file_path: Path) -> dict:
-    """Load JSON file."""
+    """Load JSON file.
+
+    Parses are memoized on (path, mtime) so the same cookie/header file
+    is decoded once across pipeline steps; a file edit invalidates the
+    cache. Callers must not mutate the returned object.
+    """
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        return _load_json_cached(str(file_path), file_path.stat().st_mtime_ns)
     except Exception as e:
         raise click.BadParameter(f"Failed to load JSON file {file_path}: {e}")
 
@@ -55,35 +65,34 @@ def main():
 
 
 @main.command()
-@click.option("--whitelist", required=True, type=click.Path(exists=True), help="File with whitelist URLs (one per line)")
-@click.option("--cookie", type=click.Path(exists=True), help="Cookie JSON file")
-@click.option("--header", type=click.Path(exists=True), help="Header JSON file")
+@click.option("--whitelist", required=True, type=click.Path(exists=True, path_type=Path, resolve_path=True), help="File with whitelist URLs (one per line)")
+@click.option("--cookie", type=click.Path(exists=True, path_type=Path, resolve_path=True), help="Cookie JSON file")
+@click.option("--header", type=click.Path(exists=True, path_type=Path, resolve_path=True), help="Header JSON file")
 @click.option("--depth", type=int, default=DEFAULT_NAVIGATION_DEPTH, help="Navigation depth for BFS")
-@click.option("--output", type=click.Path(), help="Output scenario directory (default: scenarios/<timestamp>)")
-def capture(whitelist: str, cookie: Optional[str], header: Optional[str], depth: int, output: Optional[str]):
+@click.option("--output", type=click.Path(path_type=Path), help="Output scenario directory (default: scenarios/<timestamp>)")
+def capture(whitelist: Path, cookie: Optional[Path], header: Optional[Path], depth: int, output: Optional[Path]):
     """Capture API traffic using Playwright."""
     from datetime import datetime
     
-    whitelist_path = Path(whitelist)
-    urls = load_whitelist(whitelist_path)
+    urls = load_whitelist(whitelist)
     
     if not urls:
         raise click.BadParameter("Whitelist file is empty")
     
     cookies = None
     if cookie:
-        cookies = load_json_file(Path(cookie))
+        cookies = load_json_file(cookie)
         if not isinstance(cookies, list):
             raise click.BadParameter("Cookie file must contain a JSON array")
     
     headers = None
     if header:
-        headers = load_json_file(Path(header))
+        headers = load_json_file(header)
         if not isinstance(headers, dict):
             raise click.BadParameter("Header file must contain a JSON object")
     
     if output:
-        output_dir = Path(output)
+        output_dir = output
     else:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         output_dir = Path("scenarios") / timestamp
@@ -97,14 +106,13 @@ def capture(whitelist: str, cookie: Optional[str], header: Optional[str], depth:
 
 
 @main.command()
-@click.option("--scenario", required=True, type=click.Path(exists=True), help="Scenario directory path")
-def parse(scenario: str):
+@click.option("--scenario", required=True, type=click.Path(exists=True, path_type=Path, resolve_path=True), help="Scenario directory path")
+def parse(scenario: Path):
     """Parse captured requests and extract endpoints."""
-    scenario_dir = Path(scenario)
-    requests_file = scenario_dir / "requests.json"
+    requests_file = scenario / "requests.json"
     
     if not requests_file.exists():
-        raise click.BadParameter(f"requests.json not found in {scenario_dir}")
+        raise click.BadParameter(f"requests.json not found in {scenario}")
     
     click.echo(f"Parsing requests from {requests_file}...")
     
@@ -114,80 +122,80 @@ def parse(scenario: str):
     endpoints_data = [endpoint.to_dict() for endpoint in endpoints]
     enhanced_endpoints = enhance_endpoints_with_ids(endpoints_data)
     
-    endpoints_file = scenario_dir / "endpoints.json"
-    with open(endpoints_file, "w", encoding="utf-8") as f:
-        json.dump(enhanced_endpoints, f, indent=2, ensure_ascii=False)
-    
+    endpoints_file = scenario / "endpoints.json"
+    endpoints_file.write_bytes(_json.dumps(enhanced_endpoints))
+
     click.echo(f"Parsed {len(enhanced_endpoints)} endpoints, saved to {endpoints_file}")
 
 
 @main.command()
-@click.option("--scenario", required=True, type=click.Path(exists=True), help="Scenario directory path")
+@click.option("--scenario", required=True, type=click.Path(exists=True, path_type=Path, resolve_path=True), help="Scenario directory path")
 @click.option("--max-tests", type=int, default=DEFAULT_MAX_TESTS_PER_ENDPOINT, help="Maximum tests per endpoint")
 @click.option("--allow-destructive", is_flag=True, help="Allow destructive DELETE tests")
-def generate(scenario: str, max_tests: int, allow_destructive: bool):
+def generate(scenario: Path, max_tests: int, allow_destructive: bool):
     """Generate test cases from endpoints."""
-    scenario_dir = Path(scenario)
-    endpoints_file = scenario_dir / "endpoints.json"
+    endpoints_file = scenario / "endpoints.json"
     
     if not endpoints_file.exists():
-        raise click.BadParameter(f"endpoints.json not found in {scenario_dir}")
+        raise click.BadParameter(f"endpoints.json not found in {scenario}")
     
     click.echo(f"Generating tests from {endpoints_file}...")
     
-    tests_file = scenario_dir / "tests.json"
+    tests_file = scenario / "tests.json"
     generate_tests(endpoints_file, tests_file, max_tests, allow_destructive)
     
     click.echo(f"Tests generated, saved to {tests_file}")
 
 
 @main.command()
-@click.option("--scenario", required=True, type=click.Path(exists=True), help="Scenario directory path")
-@click.option("--cookie", type=click.Path(exists=True), help="Cookie JSON file")
-@click.option("--header", type=click.Path(exists=True), help="Header JSON file")
+@click.option("--scenario", required=True, type=click.Path(exists=True, path_type=Path, resolve_path=True), help="Scenario directory path")
+@click.option("--cookie", type=click.Path(exists=True, path_type=Path, resolve_path=True), help="Cookie JSON file")
+@click.option("--header", type=click.Path(exists=True, path_type=Path, resolve_path=True), help="Header JSON file")
 @click.option("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Maximum concurrent requests")
 @click.option("--rate", type=float, default=DEFAULT_REQUESTS_PER_SECOND, help="Requests per second")
-def run(scenario: str, cookie: Optional[str], header: Optional[str], concurrency: int, rate: float):
+def run(scenario: Path, cookie: Optional[Path], header: Optional[Path], concurrency: int, rate: float):
     """Run test cases against the target."""
-    scenario_dir = Path(scenario)
-    tests_file = scenario_dir / "tests.json"
+    tests_file = scenario / "tests.json"
     
     if not tests_file.exists():
-        raise click.BadParameter(f"tests.json not found in {scenario_dir}")
+        raise click.BadParameter(f"tests.json not found in {scenario}")
     
     cookies = None
     if cookie:
-        cookies = load_json_file(Path(cookie))
+        cookies = load_json_file(cookie)
         if not isinstance(cookies, list):
             raise click.BadParameter("Cookie file must contain a JSON array")
     
     headers = None
     if header:
-        headers = load_json_file(Path(header))
+        headers = load_json_file(header)
         if not isinstance(headers, dict):
             raise click.BadParameter("Header file must contain a JSON object")
     
     click.echo(f"Running tests from {tests_file}...")
     click.echo(f"Concurrency: {concurrency}, Rate: {rate}/s")
     
-    results_file = scenario_dir / "test_results.json"
+    results_file = scenario / "test_results.jsonl"
     asyncio.run(run_tests(tests_file, results_file, cookies, headers, concurrency, rate))
     
     click.echo(f"Tests complete! Results saved to {results_file}")
 
 
 @main.command()
-@click.option("--scenario", required=True, type=click.Path(exists=True), help="Scenario directory path")
-def analyze(scenario: str):
+@click.option("--scenario", required=True, type=click.Path(exists=True, path_type=Path, resolve_path=True), help="Scenario directory path")
+def analyze(scenario: Path):
     """Analyze test results and generate findings."""
-    scenario_dir = Path(scenario)
+    scenario_dir = scenario
     requests_file = scenario_dir / "requests.json"
-    test_results_file = scenario_dir / "test_results.json"
+    test_results_file = scenario_dir / "test_results.jsonl"
+    if not test_results_file.exists():
+        # Fall back to the legacy array format from older runs
+        test_results_file = scenario_dir / "test_results.json"
     tests_file = scenario_dir / "tests.json"
     
     for file_path, name in [
         (requests_file, "requests.json"),
-        (test_results_file, "test_results.json"),
+        (test_results_file, "test results"),
         (tests_file, "tests.json"),
     ]:
         if not file_path.exists():
@@ -196,36 +204,36 @@ def analyze(scenario: str):
     click.echo("Analyzing test results...")
     
     findings_file = scenario_dir / "findings.json"
-    analyze_results(requests_file, test_results_file, tests_file, findings_file)
-    
+    findings = analyze_results(requests_file, test_results_file, tests_file, findings_file)
+
     click.echo(f"Analysis complete! Findings saved to {findings_file}")
-    
-    # Generate reports
+
+    # Generate reports from the in-memory findings
     click.echo("Generating reports...")
-    generate_reports(findings_file, scenario_dir)
+    generate_reports([finding.to_dict() for finding in findings], scenario_dir)
     click.echo("Reports generated: report.md and report.json")
 
 
 @main.command()
-@click.option("--whitelist", required=True, type=click.Path(exists=True), help="File with whitelist URLs (one per line)")
-@click.option("--cookie", type=click.Path(exists=True), help="Cookie JSON file")
-@click.option("--header", type=click.Path(exists=True), help="Header JSON file")
+@click.option("--whitelist", required=True, type=click.Path(exists=True, path_type=Path, resolve_path=True), help="File with whitelist URLs (one per line)")
+@click.option("--cookie", type=click.Path(exists=True, path_type=Path, resolve_path=True), help="Cookie JSON file")
+@click.option("--header", type=click.Path(exists=True, path_type=Path, resolve_path=True), help="Header JSON file")
 @click.option("--depth", type=int, default=DEFAULT_NAVIGATION_DEPTH, help="Navigation depth for BFS")
 @click.option("--max-tests", type=int, default=DEFAULT_MAX_TESTS_PER_ENDPOINT, help="Maximum tests per endpoint")
 @click.option("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Maximum concurrent requests")
 @click.option("--rate", type=float, default=DEFAULT_REQUESTS_PER_SECOND, help="Requests per second")
 @click.option("--allow-destructive", is_flag=True, help="Allow destructive DELETE tests")
-@click.option("--output", type=click.Path(), help="Output scenario directory (default: scenarios/<timestamp>)")
+@click.option("--output", type=click.Path(path_type=Path), help="Output scenario directory (default: scenarios/<timestamp>)")
 def full(
-    whitelist: str,
-    cookie: Optional[str],
-    header: Optional[str],
+    whitelist: Path,
+    cookie: Optional[Path],
+    header: Optional[Path],
     depth: int,
     max_tests: int,
     concurrency: int,
     rate: float,
     allow_destructive: bool,
-    output: Optional[str],
+    output: Optional[Path],
 ):
     """Run the complete surfacerecon pipeline."""
     from datetime import datetime
@@ -234,19 +242,18 @@ def full(
     
     # Step 1: Capture
     click.echo("[1/5] Capturing traffic...")
-    whitelist_path = Path(whitelist)
-    urls = load_whitelist(whitelist_path)
+    urls = load_whitelist(whitelist)
     
     cookies = None
     if cookie:
-        cookies = load_json_file(Path(cookie))
+        cookies = load_json_file(cookie)
     
     headers = None
     if header:
-        headers = load_json_file(Path(header))
+        headers = load_json_file(header)
     
     if output:
-        scenario_dir = Path(output)
+        scenario_dir = output
     else:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         scenario_dir = Path("scenarios") / timestamp
@@ -261,27 +268,28 @@ def full(
     endpoints_data = [endpoint.to_dict() for endpoint in endpoints]
     enhanced_endpoints = enhance_endpoints_with_ids(endpoints_data)
     endpoints_file = scenario_dir / "endpoints.json"
-    with open(endpoints_file, "w", encoding="utf-8") as f:
-        json.dump(enhanced_endpoints, f, indent=2, ensure_ascii=False)
+    endpoints_file.write_bytes(_json.dumps(enhanced_endpoints))
     click.echo(f"✓ Parsed {len(enhanced_endpoints)} endpoints\n")
     
-    # Step 3: Generate
+    # Step 3: Generate. From here on each step hands its output to the
+    # next in memory; the JSON artifacts are still written for resuming
+    # individual sub-commands later.
     click.echo("[3/5] Generating tests...")
     tests_file = scenario_dir / "tests.json"
-    generate_tests(endpoints_file, tests_file, max_tests, allow_destructive)
+    tests = generate_tests(enhanced_endpoints, tests_file, max_tests, allow_destructive)
     click.echo("✓ Tests generated\n")
     
     # Step 4: Run
     click.echo("[4/5] Running tests...")
-    results_file = scenario_dir / "test_results.json"
-    asyncio.run(run_tests(tests_file, results_file, cookies, headers, concurrency, rate))
+    results_file = scenario_dir / "test_results.jsonl"
+    results = asyncio.run(run_tests(tests, results_file, cookies, headers, concurrency, rate))
     click.echo("✓ Tests complete\n")
     
     # Step 5: Analyze
     click.echo("[5/5] Analyzing results...")
     findings_file = scenario_dir / "findings.json"
-    analyze_results(requests_file, results_file, tests_file, findings_file)
-    generate_reports(findings_file, scenario_dir)
+    findings = analyze_results(requests_file, results, tests, findings_file)
+    generate_reports([finding.to_dict() for finding in findings], scenario_dir)
     click.echo("✓ Analysis complete\n")
     
     click.echo(f"=== Pipeline Complete ===")
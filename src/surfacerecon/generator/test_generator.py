@@ -1,10 +1,19 @@
 """Test generator for creating vulnerability test cases."""
 
-import json
 import logging
 import random
+import re
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterator, List, Any, Optional
+
+import orjson
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
 
 from surfacerecon.settings import (
     DEFAULT_MAX_TESTS_PER_ENDPOINT,
@@ -19,162 +28,234 @@ from surfacerecon.settings import (
 
 logger = logging.getLogger(__name__)
 
+# All ID placeholders a templated path can contain; substituted in one
+# pass instead of three chained str.replace scans
+_ID_TEMPLATE_RE = re.compile(r"\{id:(?:int|uuid)\}|\{param\}")
 
-class TestCase:
-    """Represents a single test case."""
-    
-    def __init__(
-        self,
-        test_id: str,
-        test_type: str,
-        endpoint: str,
-        method: str,
-        url: str,
-        headers: Optional[Dict[str, str]] = None,
-        body: Optional[Dict[str, Any]] = None,
-        cookies: bool = True,
-        description: str = "",
-    ):
-        self.test_id = test_id
-        self.test_type = test_type
-        self.endpoint = endpoint
-        self.method = method
-        self.url = url
-        self.headers = headers or {}
-        self.body = body
-        self.cookies = cookies
-        self.description = description
-    
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary."""
-        return {
-            "test_id": self.test_id,
-            "test_type": self.test_type,
-            "endpoint": self.endpoint,
-            "method": self.method,
-            "url": self.url,
-            "headers": self.headers,
-            "body": self.body,
-            "cookies": self.cookies,
-            "description": self.description,
-        }
+
+def _classify_suspicious_field(field: str) -> Any:
+    """Pick the probe value to inject for one suspicious field name."""
+    lf = field.lower()
+    if "admin" in lf or "is" in lf:
+        return True
+    if "role" in lf:
+        return "admin"
+    if "permission" in lf or "access" in lf:
+        return "full"
+    return True
+
+
+# Field -> injected value, classified once at import instead of running
+# the cascaded lowercase/substring checks per endpoint
+SUSPICIOUS_FIELD_VALUES = {
+    field: _classify_suspicious_field(field) for field in SUSPICIOUS_FIELDS
+}
+
+# The default-count field slice, precomputed as a tuple so each endpoint
+# avoids re-slicing SUSPICIOUS_FIELDS
+_SUSPICIOUS_FIELD_SLICES = {
+    MASS_ASSIGNMENT_TEST_COUNT: tuple(SUSPICIOUS_FIELDS[:MASS_ASSIGNMENT_TEST_COUNT])
+}
+
+# Alternative-method tables keyed by the original method, built once at
+# import instead of two list comprehensions per endpoint
+_ALT_METHODS_ALL = {
+    method: tuple(m for m in HTTP_METHODS if m != method) for method in HTTP_METHODS
+}
+_ALT_METHODS_SAFE = {
+    method: tuple(m for m in alternatives if m not in DESTRUCTIVE_METHODS)
+    for method, alternatives in _ALT_METHODS_ALL.items()
+}
+# Fallbacks for original methods outside HTTP_METHODS: nothing to exclude
+_ALT_METHODS_ALL_DEFAULT = tuple(HTTP_METHODS)
+_ALT_METHODS_SAFE_DEFAULT = tuple(
+    m for m in HTTP_METHODS if m not in DESTRUCTIVE_METHODS
+)
+
+
+def _iter_endpoints(endpoints_file: Path) -> Iterator[Dict[str, Any]]:
+    """Yield endpoint dicts one at a time.
+
+    Streams the JSON array with ijson (part of the ``speedups`` extra) so
+    only one endpoint is materialized at a time; falls back to loading the
+    whole file when ijson isn't installed.
+    """
+    if ijson is not None:
+        with open(endpoints_file, "rb") as f:
+            # use_float keeps non-integer numbers as floats; ijson's
+            # default Decimals would leak into test bodies and fail
+            # orjson serialization
+            yield from ijson.items(f, "item", use_float=True)
+    else:
+        yield from orjson.loads(endpoints_file.read_bytes())
+
+
+def flatten_id_pools(endpoint_pools: List[Dict[str, Any]]) -> Dict[str, tuple]:
+    """Flatten per-endpoint ID pools into one pool-name -> IDs mapping.
+
+    Done once per generate_tests call; generate_idor_tests previously
+    re-walked every endpoint's pools on every invocation (O(N^2) for N
+    endpoints). Values are deduplicated (the same entity is usually
+    observed many times, which skewed sampling toward frequent IDs and
+    wasted rejection retries) and kept as order-preserving tuples for
+    O(1) random.choice indexing.
+    """
+    all_id_pools: Dict[str, List[Any]] = {}
+    for pools in endpoint_pools:
+        for pool_name, pool_data in pools.items():
+            pool_ids = all_id_pools.setdefault(pool_name, [])
+            pool_ids.extend(pool_data.get("integer_ids", []))
+            pool_ids.extend(pool_data.get("uuid_ids", []))
+            pool_ids.extend(pool_data.get("string_ids", []))
+    return {name: tuple(dict.fromkeys(ids)) for name, ids in all_id_pools.items()}
 
 
 def generate_idor_tests(
     endpoint: Dict[str, Any],
-    all_endpoints: List[Dict[str, Any]],
+    global_id_pools: Dict[str, tuple],
+    ep_idx: int = 0,
     count: int = IDOR_TEST_COUNT,
-) -> List[TestCase]:
-    """Generate IDOR (Insecure Direct Object Reference) tests."""
+    rng: Optional[random.Random] = None,
+) -> List[Dict[str, Any]]:
+    """Generate IDOR (Insecure Direct Object Reference) tests.
+
+    Args:
+        endpoint: The endpoint under test
+        global_id_pools: Flattened cross-endpoint ID pools from
+            flatten_id_pools
+        ep_idx: Index of the endpoint, used for compact test IDs
+        count: Maximum number of tests to generate
+        rng: Private RNG; defaults to a fresh instance seeded by ep_idx,
+            making regeneration deterministic and lock-free
+    """
+    if rng is None:
+        rng = random.Random(ep_idx)
+
     tests = []
     endpoint_id_pools = endpoint.get("id_pools", {})
-    
+
     if not endpoint_id_pools:
         return tests
-    
-    # Collect all ID pools from all endpoints
-    all_id_pools: Dict[str, List[Any]] = {}
-    for ep in all_endpoints:
-        for pool_name, pool_data in ep.get("id_pools", {}).items():
-            if pool_name not in all_id_pools:
-                all_id_pools[pool_name] = []
-            # Collect IDs from this pool
-            pool_ids = []
-            pool_ids.extend(pool_data.get("integer_ids", []))
-            pool_ids.extend(pool_data.get("uuid_ids", []))
-            pool_ids.extend(pool_data.get("string_ids", []))
-            all_id_pools[pool_name].extend(pool_ids)
-    
+
+
     # Generate tests by replacing IDs with IDs from other pools
     templated_path = endpoint.get("templated_path", "")
     method = endpoint.get("method", "GET")
-    base_url = ""  # Will be constructed from endpoint
-    
-    for i in range(min(count, len(endpoint_id_pools) * 5)):  # Limit iterations
-        # Pick a random ID parameter from this endpoint
-        pool_names = list(endpoint_id_pools.keys())
-        if not pool_names:
-            break
-        
-        source_pool_name = random.choice(pool_names)
-        source_pool = endpoint_id_pools[source_pool_name]
-        
-        # Get original ID value
-        source_ids = []
-        source_ids.extend(source_pool.get("integer_ids", []))
-        source_ids.extend(source_pool.get("uuid_ids", []))
-        source_ids.extend(source_pool.get("string_ids", []))
-        
-        if not source_ids:
-            continue
-        
-        original_id = random.choice(source_ids)
-        
-        # Find a different ID from another pool (cross-pool IDOR)
+
+    # Flatten each source pool once and batch the pool-name picks in a
+    # single choices() call instead of one choice() per iteration
+    flat_source_pools = {
+        name: (
+            tuple(pool.get("integer_ids", []))
+            + tuple(pool.get("uuid_ids", []))
+            + tuple(pool.get("string_ids", []))
+        )
+        for name, pool in endpoint_id_pools.items()
+    }
+
+    # Feasibility is decided up front: a usable source pool has IDs and
+    # at least one non-empty foreign pool to draw targets from, so the
+    # loop below never burns iterations on empty-pool continues
+    feasible_targets = {
+        name: tuple(
+            pool_name
+            for pool_name, pool_ids in global_id_pools.items()
+            if pool_name != name and pool_ids
+        )
+        for name, ids in flat_source_pools.items()
+        if ids
+    }
+    feasible_sources = tuple(
+        name for name, targets in feasible_targets.items() if targets
+    )
+    if not feasible_sources:
+        return []
+
+    iterations = min(count, len(feasible_sources) * 5)  # Limit iterations
+    source_pool_picks = rng.choices(feasible_sources, k=iterations)
+
+    # Shared body template plus the keys needing ID replacement, computed
+    # once; each test then builds its body in a single comprehension pass
+    # instead of copy-then-mutate with per-key lowercasing
+    sample_bodies = endpoint.get("sample_bodies")
+    base_body = sample_bodies[0] if sample_bodies else None
+    id_keys = (
+        {key for key in base_body if "id" in key.lower()} if base_body else frozenset()
+    )
+
+    for i, source_pool_name in enumerate(source_pool_picks):
+        original_id = rng.choice(flat_source_pools[source_pool_name])
+
+        # Find a different ID from another pool (cross-pool IDOR);
+        # rejection-sample the "different value" constraint instead of
+        # rebuilding a filtered candidate list every iteration
         target_pool_name = None
         target_id = None
-        
-        for pool_name, pool_ids in all_id_pools.items():
-            if pool_name != source_pool_name and pool_ids:
-                # Make sure it's a different value
-                candidate_ids = [id_val for id_val in pool_ids if id_val != original_id]
-                if candidate_ids:
-                    target_id = random.choice(candidate_ids)
-                    target_pool_name = pool_name
-                    break
-        
+
+        for pool_name in feasible_targets[source_pool_name]:
+            pool_ids = global_id_pools[pool_name]
+            candidate = rng.choice(pool_ids)
+            retries = 0
+            while candidate == original_id and retries < 8:
+                candidate = rng.choice(pool_ids)
+                retries += 1
+            if candidate != original_id:
+                target_id = candidate
+                target_pool_name = pool_name
+                break
+
         if not target_id:
             continue
-        
+
         # Construct URL with replaced ID
         # This is simplified - in practice, we'd need to reconstruct the full URL
-        test_url = templated_path.replace("{id:int}", str(target_id))
-        test_url = test_url.replace("{id:uuid}", str(target_id))
-        test_url = test_url.replace("{param}", str(target_id))
-        
+        test_url = _ID_TEMPLATE_RE.sub(str(target_id), templated_path)
+
         # Also need to handle query params and body
         test_body = None
-        if endpoint.get("sample_bodies"):
-            test_body = endpoint["sample_bodies"][0].copy()
-            # Replace ID in body if present
-            for key in test_body:
-                if key == source_pool_name or "id" in key.lower():
-                    test_body[key] = target_id
-        
-        test = TestCase(
-            test_id=f"idor_{endpoint.get('templated_path', '')}_{i}",
-            test_type="IDOR",
-            endpoint=templated_path,
-            method=method,
-            url=test_url,
-            body=test_body,
-            description=f"IDOR: Replace {source_pool_name}={original_id} with {target_pool_name}={target_id}",
-        )
-        tests.append(test)
+        if base_body is not None:
+            test_body = {
+                key: target_id if key == source_pool_name or key in id_keys else value
+                for key, value in base_body.items()
+            }
+
+        tests.append({
+            "test_id": f"idor_{ep_idx}_{i}",
+            "test_type": "IDOR",
+            "endpoint": templated_path,
+            "method": method,
+            "url": test_url,
+            "headers": {},
+            "body": test_body,
+            "cookies": True,
+            "description": f"IDOR: Replace {source_pool_name}={original_id} with {target_pool_name}={target_id}",
+        })
     
     return tests[:count]
 
 
 def generate_auth_bypass_tests(
     endpoint: Dict[str, Any],
+    ep_idx: int = 0,
     count: int = AUTH_BYPASS_TEST_COUNT,
-) -> List[TestCase]:
+) -> List[Dict[str, Any]]:
     """Generate authentication bypass tests."""
     tests = []
     templated_path = endpoint.get("templated_path", "")
     method = endpoint.get("method", "GET")
-    
+
     for i in range(count):
-        test = TestCase(
-            test_id=f"auth_bypass_{templated_path}_{i}",
-            test_type="AUTH_BYPASS",
-            endpoint=templated_path,
-            method=method,
-            url=templated_path,
-            cookies=False,
-            description="Auth bypass: Remove authentication cookies/headers",
-        )
-        tests.append(test)
+        tests.append({
+            "test_id": f"auth_bypass_{ep_idx}_{i}",
+            "test_type": "AUTH_BYPASS",
+            "endpoint": templated_path,
+            "method": method,
+            "url": templated_path,
+            "headers": {},
+            "body": None,
+            "cookies": False,
+            "description": "Auth bypass: Remove authentication cookies/headers",
+        })
     
     return tests
 
@@ -182,45 +263,50 @@ def generate_auth_bypass_tests(
 def generate_method_confusion_tests(
     endpoint: Dict[str, Any],
     allow_destructive: bool = False,
+    ep_idx: int = 0,
     count: int = METHOD_CONFUSION_TEST_COUNT,
-) -> List[TestCase]:
+) -> List[Dict[str, Any]]:
     """Generate HTTP method confusion tests."""
     tests = []
     templated_path = endpoint.get("templated_path", "")
     original_method = endpoint.get("method", "GET")
     
-    # Try alternative methods
-    alternative_methods = [m for m in HTTP_METHODS if m != original_method]
-    
-    if not allow_destructive:
-        alternative_methods = [m for m in alternative_methods if m not in DESTRUCTIVE_METHODS]
-    
-    # Limit to count
-    alternative_methods = alternative_methods[:count]
-    
+    # Try alternative methods, limited to count
+    if allow_destructive:
+        alternative_methods = _ALT_METHODS_ALL.get(
+            original_method, _ALT_METHODS_ALL_DEFAULT
+        )[:count]
+    else:
+        alternative_methods = _ALT_METHODS_SAFE.get(
+            original_method, _ALT_METHODS_SAFE_DEFAULT
+        )[:count]
+
+    # Never mutated downstream, so all method variants can share the
+    # sample body by reference instead of copying it per test
+    sample_bodies = endpoint.get("sample_bodies")
+    test_body = sample_bodies[0] if sample_bodies else None
+
     for method in alternative_methods:
-        test_body = None
-        if endpoint.get("sample_bodies"):
-            test_body = endpoint["sample_bodies"][0].copy() if endpoint["sample_bodies"] else None
-        
-        test = TestCase(
-            test_id=f"method_confusion_{templated_path}_{method}",
-            test_type="METHOD_CONFUSION",
-            endpoint=templated_path,
-            method=method,
-            url=templated_path,
-            body=test_body,
-            description=f"Method confusion: Try {method} instead of {original_method}",
-        )
-        tests.append(test)
+        tests.append({
+            "test_id": f"method_confusion_{ep_idx}_{method}",
+            "test_type": "METHOD_CONFUSION",
+            "endpoint": templated_path,
+            "method": method,
+            "url": templated_path,
+            "headers": {},
+            "body": test_body,
+            "cookies": True,
+            "description": f"Method confusion: Try {method} instead of {original_method}",
+        })
     
     return tests
 
 
 def generate_mass_assignment_tests(
     endpoint: Dict[str, Any],
+    ep_idx: int = 0,
     count: int = MASS_ASSIGNMENT_TEST_COUNT,
-) -> List[TestCase]:
+) -> List[Dict[str, Any]]:
     """Generate mass assignment tests."""
     tests = []
     templated_path = endpoint.get("templated_path", "")
@@ -230,95 +316,155 @@ def generate_mass_assignment_tests(
     if method not in ["POST", "PUT", "PATCH"]:
         return tests
     
-    # Get sample body
-    base_body = {}
-    if endpoint.get("sample_bodies"):
-        base_body = endpoint["sample_bodies"][0].copy()
-    
+    # Get sample body; the unpack below copies it per test, so the
+    # template itself can be shared
+    sample_bodies = endpoint.get("sample_bodies")
+    base_body = sample_bodies[0] if sample_bodies else {}
+
     # Generate tests with suspicious fields
-    suspicious_fields = SUSPICIOUS_FIELDS[:count]
-    
+    suspicious_fields = _SUSPICIOUS_FIELD_SLICES.get(count) or SUSPICIOUS_FIELDS[:count]
+
     for i, field in enumerate(suspicious_fields):
-        test_body = base_body.copy()
-        
-        # Add suspicious field with different values
-        if "admin" in field.lower() or "is" in field.lower():
-            test_body[field] = True
-        elif "role" in field.lower():
-            test_body[field] = "admin"
-        elif "permission" in field.lower() or "access" in field.lower():
-            test_body[field] = "full"
-        else:
-            test_body[field] = True
-        
-        test = TestCase(
-            test_id=f"mass_assignment_{templated_path}_{i}",
-            test_type="MASS_ASSIGNMENT",
-            endpoint=templated_path,
-            method=method,
-            url=templated_path,
-            body=test_body,
-            description=f"Mass assignment: Add suspicious field {field}={test_body[field]}",
-        )
-        tests.append(test)
+        # Dict unpacking builds base + injected field in one C-level pass
+        # instead of copy-then-assign
+        test_body = {**base_body, field: SUSPICIOUS_FIELD_VALUES[field]}
+
+        tests.append({
+            "test_id": f"mass_assignment_{ep_idx}_{i}",
+            "test_type": "MASS_ASSIGNMENT",
+            "endpoint": templated_path,
+            "method": method,
+            "url": templated_path,
+            "headers": {},
+            "body": test_body,
+            "cookies": True,
+            "description": f"Mass assignment: Add suspicious field {field}={test_body[field]}",
+        })
     
     return tests
 
 
+def _generate_endpoint_tests(
+    endpoint: Dict[str, Any],
+    ep_idx: int,
+    global_id_pools: Dict[str, tuple],
+    max_tests: int,
+    allow_destructive: bool,
+) -> List[Dict[str, Any]]:
+    """Generate all test types for one endpoint.
+
+    Top-level (picklable) so it can run in process-pool workers; each
+    endpoint is independent once global_id_pools is precomputed.
+    """
+    endpoint_tests: List[Dict[str, Any]] = []
+
+    # Generate IDOR tests; skip endpoints with no ID pools before
+    # the generator pays its setup cost
+    if endpoint.get("id_pools"):
+        endpoint_tests.extend(generate_idor_tests(endpoint, global_id_pools, ep_idx))
+
+    # Generate auth bypass tests
+    endpoint_tests.extend(generate_auth_bypass_tests(endpoint, ep_idx))
+
+    # Generate method confusion tests
+    endpoint_tests.extend(
+        generate_method_confusion_tests(endpoint, allow_destructive, ep_idx)
+    )
+
+    # Generate mass assignment tests; only body-carrying methods apply
+    if endpoint.get("method") in {"POST", "PUT", "PATCH"}:
+        endpoint_tests.extend(generate_mass_assignment_tests(endpoint, ep_idx))
+
+    # Limit to max_tests per endpoint
+    if len(endpoint_tests) > max_tests:
+        endpoint_tests = endpoint_tests[:max_tests]
+
+    # Per-endpoint logging is debug-only; the isEnabledFor guard also
+    # skips the f-string formatting when suppressed
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            f"Generated {len(endpoint_tests)} tests for {endpoint.get('templated_path', 'unknown')}"
+        )
+    return endpoint_tests
+
+
+# Below this many endpoints, process spawn/pickle overhead outweighs the
+# parallel speedup and generation stays in-process
+_PARALLEL_ENDPOINT_THRESHOLD = 32
+
+
 def generate_tests(
-    endpoints_file: Path,
+    endpoints: Path | List[Dict[str, Any]],
     output_file: Path,
     max_tests: int = DEFAULT_MAX_TESTS_PER_ENDPOINT,
     allow_destructive: bool = False,
-) -> None:
+) -> List[Dict[str, Any]]:
     """
     Generate test cases for all endpoints.
-    
+
     Args:
-        endpoints_file: Path to endpoints.json
+        endpoints: Path to endpoints.json, or the already-loaded endpoint
+            dictionaries (the full pipeline passes these in memory instead
+            of re-reading the file it just wrote)
         output_file: Path to save tests.json
         max_tests: Maximum tests per endpoint
         allow_destructive: Allow destructive DELETE tests
+
+    Returns:
+        List of generated test dictionaries
     """
-    with open(endpoints_file, "r", encoding="utf-8") as f:
-        endpoints = json.load(f)
-    
-    all_tests: List[TestCase] = []
-    
-    for endpoint in endpoints:
-        endpoint_tests: List[TestCase] = []
-        
-        # Generate IDOR tests
-        idor_tests = generate_idor_tests(endpoint, endpoints)
-        endpoint_tests.extend(idor_tests)
-        
-        # Generate auth bypass tests
-        auth_tests = generate_auth_bypass_tests(endpoint)
-        endpoint_tests.extend(auth_tests)
-        
-        # Generate method confusion tests
-        method_tests = generate_method_confusion_tests(endpoint, allow_destructive)
-        endpoint_tests.extend(method_tests)
-        
-        # Generate mass assignment tests
-        mass_tests = generate_mass_assignment_tests(endpoint)
-        endpoint_tests.extend(mass_tests)
-        
-        # Limit to max_tests per endpoint
-        if len(endpoint_tests) > max_tests:
-            endpoint_tests = endpoint_tests[:max_tests]
-        
-        all_tests.extend(endpoint_tests)
-        logger.info(
-            f"Generated {len(endpoint_tests)} tests for {endpoint.get('templated_path', 'unknown')}"
-        )
-    
-    # Save tests
+    from_file = isinstance(endpoints, Path)
+
+    # First pass (streaming when reading from disk): collect only the
+    # per-endpoint ID pools needed for cross-pool IDOR generation
+    first_pass = _iter_endpoints(endpoints) if from_file else endpoints
+    endpoint_pools = [ep.get("id_pools", {}) for ep in first_pass]
+    global_id_pools = flatten_id_pools(endpoint_pools)
+
+    endpoint_count = len(endpoint_pools)
+    second_pass = _iter_endpoints(endpoints) if from_file else iter(endpoints)
+    all_tests: List[Dict[str, Any]] = []
+
+    if endpoint_count >= _PARALLEL_ENDPOINT_THRESHOLD:
+        # Endpoints are independent, so generation parallelizes across
+        # cores; map keeps endpoint order (and thus ep_idx assignment)
+        def _batches() -> Iterator[List[Dict[str, Any]]]:
+            with ProcessPoolExecutor() as executor:
+                yield from executor.map(
+                    _generate_endpoint_tests,
+                    second_pass,
+                    range(endpoint_count),
+                    repeat(global_id_pools),
+                    repeat(max_tests),
+                    repeat(allow_destructive),
+                    chunksize=8,
+                )
+    else:
+        def _batches() -> Iterator[List[Dict[str, Any]]]:
+            for ep_idx, endpoint in enumerate(second_pass):
+                yield _generate_endpoint_tests(
+                    endpoint, ep_idx, global_id_pools, max_tests, allow_destructive
+                )
+
+    # Stream each endpoint's batch to disk as it completes, so the file
+    # never needs one serialized blob of the whole test list; compact
+    # output — tests.json is an intermediate pipeline artifact. The tests
+    # themselves are kept for the in-memory pipeline hand-off.
     output_file.parent.mkdir(parents=True, exist_ok=True)
-    tests_data = [test.to_dict() for test in all_tests]
-    
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(tests_data, f, indent=2, ensure_ascii=False)
-    
-    logger.info(f"Generated {len(all_tests)} total tests, saved to {output_file}")
+    with open(output_file, "wb") as f:
+        f.write(b"[")
+        for endpoint_tests in _batches():
+            for test in endpoint_tests:
+                if all_tests:
+                    f.write(b",")
+                f.write(orjson.dumps(test))
+                all_tests.append(test)
+        f.write(b"]")
+
+    logger.info(
+        f"Generated {len(all_tests)} total tests across {endpoint_count} endpoints, "
+        f"saved to {output_file}"
+    )
+
+    return all_tests
 
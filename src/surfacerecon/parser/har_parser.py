@@ -1,20 +1,35 @@
 """HAR parser for extracting endpoint models from captured requests."""
 
-import json
 import logging
-import re
 from collections import defaultdict
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Set
 from urllib.parse import urlparse, parse_qs
 
+from surfacerecon import _json
+from surfacerecon.parser.id_inference import is_uuid
+
 logger = logging.getLogger(__name__)
 
+# Per-parameter caps on distinct values kept during extraction. Bounding
+# at insertion stops repeated bodies/queries from accumulating values the
+# endpoint model would discard anyway (observed_ids keeps 20, body
+# samples keep 10).
+_QUERY_VALUES_CAP = 20
+_PATH_VALUES_CAP = 20
+_BODY_VALUES_CAP = 10
+
 
+@lru_cache(maxsize=8192)
 def normalize_url(url: str) -> tuple[str, str]:
     """
     Normalize URL by removing query params for templating.
-    
+
+    Memoized: parse_requests hits the same URL several times (grouping,
+    template collection, query and path-param extraction) and HAR
+    captures repeat URLs heavily.
+
     Returns:
         (normalized_url, query_string) tuple
     """
@@ -31,34 +46,38 @@ def detect_template_path(path: str, seen_paths: List[str]) -> str:
     if not seen_paths:
         return path
     
-    # Split path into segments
+    # Split path into segments; seen paths are split once up front
+    # instead of up to three times per (segment, seen path) pair
     segments = path.split("/")
-    
+    seen_segments_list = [seen_path.split("/") for seen_path in seen_paths]
+
     # Find common pattern
     template_segments = []
     for i, segment in enumerate(segments):
-        # Check if this segment is numeric in any seen path
-        is_numeric = False
-        is_uuid = False
-        
-        for seen_path in seen_paths:
-            seen_segments = seen_path.split("/")
-            if i < len(seen_segments):
-                seg = seen_segments[i]
-                if seg.isdigit():
-                    is_numeric = True
-                elif re.match(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$", seg, re.IGNORECASE):
-                    is_uuid = True
-        
-        if is_numeric:
+        # Classify the segment in a single pass over the seen paths:
+        # numeric wins outright (so it can exit early), uuid next, and a
+        # plain difference is only the fallback for the generic placeholder
+        numeric_seen = False
+        uuid_seen = False
+        differs = False
+
+        for seen_segments in seen_segments_list:
+            if i >= len(seen_segments):
+                continue
+            seg = seen_segments[i]
+            if seg.isdigit():
+                numeric_seen = True
+                break
+            if is_uuid(seg):
+                uuid_seen = True
+            elif seg != segment:
+                differs = True
+
+        if numeric_seen:
             template_segments.append("{id:int}")
-        elif is_uuid:
+        elif uuid_seen:
             template_segments.append("{id:uuid}")
-        elif segment != segments[0] and any(
-            seen_path.split("/")[i] != segment 
-            for seen_path in seen_paths 
-            if i < len(seen_path.split("/"))
-        ):
+        elif segment != segments[0] and differs:
             # Different non-numeric segments - use generic placeholder
             template_segments.append("{param}")
         else:
@@ -75,16 +94,22 @@ def extract_query_params(query_string: str) -> Dict[str, List[str]]:
 
 
 def extract_json_body(body: str) -> Optional[Dict[str, Any]]:
-    """Extract JSON body if present."""
-    if not body or body == "(unable to read body)":
+    """Extract JSON object body if present.
+
+    Callers iterate top-level keys and keep the body as a sample, so only
+    objects are returned. The first-character probe skips the parse for
+    HTML, plain text and other bodies that can't be JSON objects.
+    """
+    if not body or not body.startswith("{"):
         return None
-    
+
     try:
-        # Try to parse as JSON
-        return json.loads(body)
-    except (json.JSONDecodeError, ValueError):
+        parsed = _json.loads(body)
+    except (_json.JSONDecodeError, ValueError):
         return None
 
+    return parsed if isinstance(parsed, dict) else None
+
 
 class EndpointModel:
     """Model representing an API endpoint."""
@@ -124,8 +149,7 @@ def parse_requests(requests_file: Path) -> List[EndpointModel]:
     Returns:
         List of EndpointModel objects
     """
-    with open(requests_file, "r", encoding="utf-8") as f:
-        requests_data = json.load(f)
+    requests_data = _json.loads(requests_file.read_bytes())
     
     # Group requests by method + normalized path
     endpoint_groups: Dict[tuple[str, str], List[Dict[str, Any]]] = defaultdict(list)
@@ -136,7 +160,11 @@ def parse_requests(requests_file: Path) -> List[EndpointModel]:
         
         method = req.get("method", "GET")
         url = req.get("url", "")
+        # Cache the parsed URL on the request; the extraction loops below
+        # revisit each request several times
         path, query = normalize_url(url)
+        req["_path"] = path
+        req["_query"] = query
         
         # Group by method and path template (we'll refine templates later)
         endpoint_groups[(method, path)].append(req)
@@ -145,7 +173,7 @@ def parse_requests(requests_file: Path) -> List[EndpointModel]:
     
     for (method, base_path), requests in endpoint_groups.items():
         # Collect all paths for this endpoint to detect templates
-        all_paths = [normalize_url(req.get("url", ""))[0] for req in requests]
+        all_paths = [req["_path"] for req in requests]
         
         # Detect template
         templated_path = detect_template_path(base_path, all_paths)
@@ -157,53 +185,64 @@ def parse_requests(requests_file: Path) -> List[EndpointModel]:
             "body": {},
         }
         
-        # Extract query params
-        query_params: Dict[str, Set[str]] = defaultdict(set)
+        # Extract query, path and body parameters in one fused pass over
+        # the group instead of traversing it three times. Plain dicts with
+        # explicit bucket creation: most lookups hit existing keys, so
+        # defaultdict's factory machinery is pure overhead here
+        query_params: Dict[str, Set[str]] = {}
+        path_params: Dict[str, Set[str]] = {}
+        body_params: Dict[str, Set[Any]] = {}
+        sample_bodies: List[Dict[str, Any]] = []
+        base_segments = base_path.split("/")
+
         for req in requests:
-            url = req.get("url", "")
-            _, query = normalize_url(url)
+            # Query params
+            query = req["_query"]
             if query:
                 parsed_qs = extract_query_params(query)
                 for key, values in parsed_qs.items():
-                    query_params[key].update(values)
-        
-        parameters["query"] = {k: list(v) for k, v in query_params.items()}
-        
-        # Extract path parameters (IDs in path)
-        path_params: Dict[str, Set[str]] = defaultdict(set)
-        for req in requests:
-            url = req.get("url", "")
-            path_segments = normalize_url(url)[0].split("/")
-            base_segments = base_path.split("/")
-            
+                    bucket = query_params.get(key)
+                    if bucket is None:
+                        bucket = query_params[key] = set()
+                    for value in values:
+                        if len(bucket) >= _QUERY_VALUES_CAP:
+                            break
+                        bucket.add(value)
+
+            # Path parameters (IDs in path)
+            path_segments = req["_path"].split("/")
             for i, (seg, base_seg) in enumerate(zip(path_segments, base_segments)):
                 if seg != base_seg:
                     # This is a parameter
                     param_name = f"param_{i}" if i < len(base_segments) else "id"
-                    path_params[param_name].add(seg)
-        
-        parameters["path"] = {k: list(v) for k, v in path_params.items()}
-        
-        # Extract body parameters
-        sample_bodies: List[Dict[str, Any]] = []
-        body_params: Dict[str, Set[Any]] = defaultdict(set)
-        
-        for req in requests:
+                    bucket = path_params.get(param_name)
+                    if bucket is None:
+                        bucket = path_params[param_name] = set()
+                    if len(bucket) < _PATH_VALUES_CAP:
+                        bucket.add(seg)
+
+            # Body parameters
             body_str = req.get("post_data", "") or ""
             if not body_str:
                 # Try response body for some cases
                 response = req.get("response", {})
                 body_str = response.get("body", "")
-            
+
             json_body = extract_json_body(body_str)
             if json_body:
                 sample_bodies.append(json_body)
                 # Extract all keys and sample values
                 for key, value in json_body.items():
                     if isinstance(value, (str, int, float, bool)):
-                        body_params[key].add(str(value))
-        
-        parameters["body"] = {k: list(v)[:10] for k, v in body_params.items()}  # Limit samples
+                        bucket = body_params.get(key)
+                        if bucket is None:
+                            bucket = body_params[key] = set()
+                        if len(bucket) < _BODY_VALUES_CAP:
+                            bucket.add(str(value))
+
+        parameters["query"] = {k: list(v) for k, v in query_params.items()}
+        parameters["path"] = {k: list(v) for k, v in path_params.items()}
+        parameters["body"] = {k: list(v) for k, v in body_params.items()}  # Bounded at insertion
         
         # Extract observed IDs (will be refined by id_inference)
         observed_ids: Dict[str, List[Any]] = {}
@@ -214,12 +253,12 @@ def parse_requests(requests_file: Path) -> List[EndpointModel]:
         
         # Collect IDs from query
         for param_name, values in parameters["query"].items():
-            if any("id" in param_name.lower() for _ in [1]):  # ID-like params
+            if "id" in param_name.lower():  # ID-like params
                 observed_ids[param_name] = values[:20]
         
         # Collect IDs from body
         for param_name, values in parameters["body"].items():
-            if any("id" in param_name.lower() for _ in [1]):  # ID-like params
+            if "id" in param_name.lower():  # ID-like params
                 observed_ids[param_name] = values[:20]
         
         endpoint = EndpointModel(
@@ -241,9 +280,7 @@ def save_endpoints(endpoints: List[EndpointModel], output_file: Path) -> None:
     output_file.parent.mkdir(parents=True, exist_ok=True)
     
     endpoints_data = [endpoint.to_dict() for endpoint in endpoints]
-    
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(endpoints_data, f, indent=2, ensure_ascii=False)
+    output_file.write_bytes(_json.dumps(endpoints_data))
     
     logger.info(f"Saved {len(endpoints)} endpoints to {output_file}")
 
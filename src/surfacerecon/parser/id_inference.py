@@ -1,14 +1,19 @@
 """ID inference module for recognizing and categorizing IDs."""
 
-import re
 import logging
-from typing import Dict, List, Any, Set, Optional
+from functools import lru_cache
+from typing import Dict, List, Any, Optional
 from collections import defaultdict
 
-from surfacerecon.settings import ID_PATTERNS, UUID_PATTERN
+from surfacerecon._scan import build_matcher
+from surfacerecon.settings import ID_PATTERNS
 
 logger = logging.getLogger(__name__)
 
+# Shared keyword matcher built once (Hyperscan when installed, compiled
+# alternation otherwise)
+_id_pattern_match = build_matcher(ID_PATTERNS)
+
 
 def is_integer_id(value: Any) -> bool:
     """Check if value is an integer ID."""
@@ -20,40 +25,72 @@ def is_integer_id(value: Any) -> bool:
 
 
 def is_uuid(value: Any) -> bool:
-    """Check if value is a UUID."""
-    if not isinstance(value, str):
+    """Check if value is a UUID.
+
+    Hand-rolled instead of a regex: for a fixed 36-char shape the check
+    reduces to a length compare, four dash positions and a hex scan,
+    which is several times faster on this per-segment hot path.
+    """
+    if not isinstance(value, str) or len(value) != 36:
+        return False
+    if value[8] != "-" or value[13] != "-" or value[18] != "-" or value[23] != "-":
+        return False
+    hex_part = value.replace("-", "")
+    if len(hex_part) != 32:  # guards against extra dashes elsewhere
         return False
-    return bool(re.match(UUID_PATTERN, value, re.IGNORECASE))
+    try:
+        bytes.fromhex(hex_part)
+    except ValueError:
+        return False
+    return True
 
 
+@lru_cache(maxsize=1024)
 def matches_id_pattern(name: str) -> bool:
-    """Check if parameter name matches common ID patterns."""
-    name_lower = name.lower()
-    return any(pattern.lower() in name_lower for pattern in ID_PATTERNS)
+    """Check if parameter name matches common ID patterns.
+
+    Memoized: the same parameter names recur across endpoints.
+    """
+    return _id_pattern_match(name)
+
+
+# Per-category cap on stored IDs; get_all/to_dict only ever surface the
+# first few dozen values, so anything past the cap would never be read
+_POOL_CAP = 64
 
 
 class IDPool:
-    """Represents a pool of IDs for a specific parameter."""
+    """Represents a pool of IDs for a specific parameter.
+
+    Each category holds at most _POOL_CAP distinct values in insertion
+    order (oldest evicted first), keeping memory bounded on captures
+    that observe thousands of IDs per parameter.
+    """
     
     def __init__(self, name: str, location: str):
         self.name = name
         self.location = location  # "path", "query", "body"
-        self.integer_ids: Set[int] = set()
-        self.uuid_ids: Set[str] = set()
-        self.string_ids: Set[str] = set()
+        self.integer_ids: Dict[int, None] = {}
+        self.uuid_ids: Dict[str, None] = {}
+        self.string_ids: Dict[str, None] = {}
         self.inferred_type: Optional[str] = None
     
+    @staticmethod
+    def _bounded_add(ids: Dict[Any, None], value: Any) -> None:
+        ids[value] = None
+        if len(ids) > _POOL_CAP:
+            del ids[next(iter(ids))]
+    
     def add(self, value: Any) -> None:
         """Add an ID value to the pool."""
         if is_integer_id(value):
             if isinstance(value, str):
-                self.integer_ids.add(int(value))
-            else:
-                self.integer_ids.add(value)
+                value = int(value)
+            self._bounded_add(self.integer_ids, value)
         elif is_uuid(value):
-            self.uuid_ids.add(str(value))
+            self._bounded_add(self.uuid_ids, str(value))
         else:
-            self.string_ids.add(str(value))
+            self._bounded_add(self.string_ids, str(value))
         
         # Infer type based on what we have
         if self.integer_ids:
@@ -65,7 +102,7 @@ class IDPool:
     
     def get_all(self) -> List[Any]:
         """Get all IDs as a list."""
-        result = list(self.integer_ids) + list(self.uuid_ids) + list(self.string_ids)
+        result = [*self.integer_ids, *self.uuid_ids, *self.string_ids]
         return result[:50]  # Limit to 50
     
     def to_dict(self) -> Dict[str, Any]:
@@ -93,45 +130,48 @@ def infer_ids_from_endpoint(endpoint: Dict[str, Any]) -> Dict[str, IDPool]:
     """
     id_pools: Dict[str, IDPool] = {}
     
-    # Process path parameters
-    path_params = endpoint.get("parameters", {}).get("path", {})
-    for param_name, values in path_params.items():
-        # Check if this looks like an ID parameter
-        if matches_id_pattern(param_name) or any(is_integer_id(v) or is_uuid(v) for v in values):
-            pool = IDPool(param_name, "path")
-            for value in values:
-                pool.add(value)
-            id_pools[param_name] = pool
-    
-    # Process query parameters
-    query_params = endpoint.get("parameters", {}).get("query", {})
-    for param_name, values in query_params.items():
-        if matches_id_pattern(param_name) or any(is_integer_id(v) or is_uuid(v) for v in values):
-            pool = IDPool(param_name, "query")
-            for value in values:
-                pool.add(value)
-            id_pools[param_name] = pool
-    
-    # Process body parameters
-    body_params = endpoint.get("parameters", {}).get("body", {})
-    for param_name, values in body_params.items():
-        if matches_id_pattern(param_name) or any(is_integer_id(v) or is_uuid(v) for v in values):
-            pool = IDPool(param_name, "body")
-            for value in values:
-                pool.add(value)
-            id_pools[param_name] = pool
-    
-    # Also check sample bodies for nested IDs
+    parameters = endpoint.get("parameters", {})
+    path_params = parameters.get("path", {})
+    query_params = parameters.get("query", {})
+    body_params = parameters.get("body", {})
     sample_bodies = endpoint.get("sample_bodies", [])
+    
+    # One batched scan over every candidate name decides whether any
+    # name-based match is possible for this endpoint; when it misses,
+    # only the value-shape checks below can qualify a parameter
+    all_names = [*path_params, *query_params, *body_params]
     for body in sample_bodies:
         if isinstance(body, dict):
-            for key, value in body.items():
-                if matches_id_pattern(key) and (is_integer_id(value) or is_uuid(value)):
-                    pool_name = f"body.{key}"
-                    if pool_name not in id_pools:
-                        pool = IDPool(pool_name, "body")
-                        id_pools[pool_name] = pool
-                    id_pools[pool_name].add(value)
+            all_names.extend(body)
+    names_may_match = bool(all_names) and _id_pattern_match("\n".join(all_names))
+    
+    for params, location in (
+        (path_params, "path"),
+        (query_params, "query"),
+        (body_params, "body"),
+    ):
+        for param_name, values in params.items():
+            # Check if this looks like an ID parameter
+            if (names_may_match and matches_id_pattern(param_name)) or any(
+                is_integer_id(v) or is_uuid(v) for v in values
+            ):
+                pool = IDPool(param_name, location)
+                for value in values:
+                    pool.add(value)
+                id_pools[param_name] = pool
+    
+    # Also check sample bodies for nested IDs; these only qualify by
+    # name, so the batched scan can skip the whole pass
+    if names_may_match:
+        for body in sample_bodies:
+            if isinstance(body, dict):
+                for key, value in body.items():
+                    if matches_id_pattern(key) and (is_integer_id(value) or is_uuid(value)):
+                        pool_name = f"body.{key}"
+                        if pool_name not in id_pools:
+                            pool = IDPool(pool_name, "body")
+                            id_pools[pool_name] = pool
+                        id_pools[pool_name].add(value)
     
     return id_pools
 
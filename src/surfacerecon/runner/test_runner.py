@@ -1,14 +1,16 @@
 """Test runner module for executing test cases."""
 
 import asyncio
-import json
 import logging
+import time
 from pathlib import Path
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 
 import httpx
+import orjson
 
+from surfacerecon import _json
 from surfacerecon.settings import (
     DEFAULT_CONCURRENCY,
     DEFAULT_REQUESTS_PER_SECOND,
@@ -17,31 +19,55 @@ from surfacerecon.settings import (
 
 logger = logging.getLogger(__name__)
 
+# Timestamp cache for _iso_now
+_ts_cache_sec = -1
+_ts_cache_iso = ""
+
+
+def _iso_now() -> str:
+    """Current ISO timestamp at second granularity, cached per second.
+
+    Result timestamps are informational only; formatting once per second
+    instead of once per request avoids a datetime build and strftime-style
+    format on every test under high concurrency.
+    """
+    global _ts_cache_sec, _ts_cache_iso
+    sec = int(time.time())
+    if sec != _ts_cache_sec:
+        _ts_cache_sec = sec
+        _ts_cache_iso = datetime.fromtimestamp(sec).isoformat()
+    return _ts_cache_iso
+
 
 class RateLimiter:
-    """Simple rate limiter using asyncio."""
-    
+    """Simple rate limiter using asyncio.
+
+    Each acquire() claims the next free send slot up front, so concurrent
+    callers are spaced min_interval apart instead of all sleeping off the
+    same last-request timestamp and firing in a burst.
+    """
+
     def __init__(self, requests_per_second: float):
         self.requests_per_second = requests_per_second
         self.min_interval = 1.0 / requests_per_second
-        self.last_request_time = 0.0
-    
+        self._next_slot = 0.0
+        self._loop = asyncio.get_running_loop()
+
     async def acquire(self) -> None:
         """Wait if necessary to respect rate limit."""
-        current_time = asyncio.get_event_loop().time()
-        time_since_last = current_time - self.last_request_time
-        
-        if time_since_last < self.min_interval:
-            await asyncio.sleep(self.min_interval - time_since_last)
-        
-        self.last_request_time = asyncio.get_event_loop().time()
+        now = self._loop.time()
+        wait = self._next_slot - now
+        self._next_slot = max(now, self._next_slot) + self.min_interval
+
+        if wait > 0:
+            await asyncio.sleep(wait)
 
 
 async def run_single_test(
     test: Dict[str, Any],
     client: httpx.AsyncClient,
     cookies: Optional[List[Dict[str, Any]]] = None,
-    headers: Optional[Dict[str, str]] = None,
+    base_headers: Optional[Dict[str, str]] = None,
     rate_limiter: Optional[RateLimiter] = None,
 ) -> Dict[str, Any]:
     """
@@ -51,7 +77,8 @@ async def run_single_test(
         test: Test case dictionary
         client: httpx async client
         cookies: Optional cookies to apply
-        headers: Optional headers to apply
+        base_headers: Static headers (user headers plus the researcher
+            header), pre-merged once by run_tests
         rate_limiter: Optional rate limiter
         
     Returns:
@@ -63,17 +90,12 @@ async def run_single_test(
     test_id = test.get("test_id", "unknown")
     method = test.get("method", "GET")
     url = test.get("url", "")
-    test_headers = test.get("headers", {}).copy()
+    test_headers = test.get("headers", {})
     test_body = test.get("body")
     use_cookies = test.get("cookies", True)
     
-    # Merge headers
-    request_headers = {}
-    if headers:
-        request_headers.update(headers)
-    if DEFAULT_RESEARCHER_HEADER:
-        request_headers.update(DEFAULT_RESEARCHER_HEADER)
-    request_headers.update(test_headers)
+    # One merge: the static part was pre-merged by run_tests
+    request_headers = {**(base_headers or {}), **test_headers}
     
     # Prepare cookies
     cookie_dict = {}
@@ -87,7 +109,7 @@ async def run_single_test(
         "endpoint": test.get("endpoint", ""),
         "method": method,
         "url": url,
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": _iso_now(),
         "success": False,
         "error": None,
         "response": None,
@@ -113,9 +135,17 @@ async def run_single_test(
         
         # Capture response
         try:
-            response_body = response.text
-            if len(response_body) > 20000:  # Truncate very long responses
-                response_body = response_body[:20000] + "\n... (truncated)"
+            content = response.content
+            if len(content) > 20000:  # Truncate very long responses
+                # Truncate the raw bytes first so decode work is capped
+                # regardless of body size; errors="replace" absorbs a cut
+                # mid-codepoint
+                response_body = (
+                    content[:20000].decode(response.encoding or "utf-8", errors="replace")
+                    + "\n... (truncated)"
+                )
+            else:
+                response_body = response.text
         except Exception:
             response_body = "(unable to read body)"
         
@@ -139,7 +169,7 @@ async def run_single_test(
 
 
 async def run_tests(
-    tests_file: Path,
+    tests: Path | List[Dict[str, Any]],
     output_file: Path,
     cookies: Optional[List[Dict[str, Any]]] = None,
     headers: Optional[Dict[str, str]] = None,
@@ -148,53 +178,82 @@ async def run_tests(
 ) -> List[Dict[str, Any]]:
     """
     Run all test cases asynchronously with rate limiting.
-    
+
     Args:
-        tests_file: Path to tests.json
-        output_file: Path to save test results
+        tests: Path to tests.json, or the already-generated test
+            dictionaries (avoids re-reading the file in the full pipeline)
+        output_file: Path to save test results (written as JSON Lines,
+            one result object per line)
         cookies: Optional cookies to apply
         headers: Optional headers to apply
         concurrency: Maximum concurrent requests
         rate: Requests per second
-        
+
     Returns:
         List of test results
     """
-    with open(tests_file, "r", encoding="utf-8") as f:
-        tests = json.load(f)
-    
+    if isinstance(tests, Path):
+        tests = _json.loads(tests.read_bytes())
+
     logger.info(f"Running {len(tests)} tests with concurrency={concurrency}, rate={rate}/s")
     
     rate_limiter = RateLimiter(rate)
-    semaphore = asyncio.Semaphore(concurrency)
-    results: List[Dict[str, Any]] = []
-    
-    async def run_with_semaphore(test: Dict[str, Any]) -> Dict[str, Any]:
-        async with semaphore:
-            async with httpx.AsyncClient() as client:
-                return await run_single_test(test, client, cookies, headers, rate_limiter)
-    
-    # Run tests with concurrency control
-    tasks = [run_with_semaphore(test) for test in tests]
-    results = await asyncio.gather(*tasks, return_exceptions=True)
-    
-    # Handle exceptions
-    processed_results = []
-    for i, result in enumerate(results):
-        if isinstance(result, Exception):
-            logger.error(f"Test {tests[i].get('test_id', 'unknown')} raised exception: {result}")
-            processed_results.append({
-                "test_id": tests[i].get("test_id", "unknown"),
-                "success": False,
-                "error": str(result),
-            })
-        else:
-            processed_results.append(result)
-    
-    # Save results
+
+    # Static portion of every request's headers, merged once for the run
+    base_headers = {**(headers or {}), **DEFAULT_RESEARCHER_HEADER}
+
+    # A fixed pool of workers draining a queue keeps only ~concurrency
+    # coroutines alive instead of one task object per test up front
+    queue: asyncio.Queue = asyncio.Queue()
+    for test in tests:
+        queue.put_nowait(test)
+
     output_file.parent.mkdir(parents=True, exist_ok=True)
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(processed_results, f, indent=2, ensure_ascii=False)
+    processed_results: List[Dict[str, Any]] = []
+
+    # One shared client for the whole run so connections (and TLS
+    # sessions) are reused across tests instead of rebuilt per request
+    limits = httpx.Limits(
+        max_connections=concurrency * 2,
+        max_keepalive_connections=concurrency,
+    )
+    async with httpx.AsyncClient(limits=limits) as client:
+        # Persist each result as it finishes instead of buffering every
+        # response body until the whole run completes; JSON Lines keeps
+        # the file appendable and streamable downstream
+        with open(output_file, "wb") as f:
+
+            async def worker() -> None:
+                # The queue is fully loaded before workers start, so an
+                # empty queue means this worker is done
+                while True:
+                    try:
+                        test = queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        return
+
+                    try:
+                        result = await run_single_test(
+                            test, client, cookies, base_headers, rate_limiter
+                        )
+                    except Exception as e:
+                        logger.error(f"Test {test.get('test_id', 'unknown')} raised exception: {e}")
+                        result = {
+                            "test_id": test.get("test_id", "unknown"),
+                            "success": False,
+                            "error": str(e),
+                        }
+
+                    f.write(orjson.dumps(result))
+                    f.write(b"\n")
+                    processed_results.append(result)
+
+            workers = [
+                asyncio.ensure_future(worker())
+                for _ in range(min(concurrency, len(tests)))
+            ]
+            if workers:
+                await asyncio.gather(*workers)
     
     successful = sum(1 for r in processed_results if r.get("success", False))
     logger.info(f"Completed {len(processed_results)} tests ({successful} successful)")
@@ -5,6 +5,7 @@ from typing import List, Dict, Any
 # Default navigation settings
 DEFAULT_NAVIGATION_DEPTH: int = 3
 DEFAULT_MAX_PAGES: int = 50
+DEFAULT_CAPTURE_CONCURRENCY: int = 4
 
 # Rate limiting defaults
 DEFAULT_CONCURRENCY: int = 5